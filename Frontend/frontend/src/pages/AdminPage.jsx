@@ -45,19 +45,25 @@ const EditUserRow = ({ user, setEditingUser, onSave }) => {
 
 const AdminPage = () => {
     const [users, setUsers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [roleFilter, setRoleFilter] = useState('');
+    const [search, setSearch] = useState('');
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState('');
     const [editingUser, setEditingUser] = useState(null);
     const [isConfirmModalOpen, setConfirmModalOpen] = useState(false);
     const { addNotification } = useNotification();
 
-    const fetchUsers = useCallback(() => {
+    const fetchUsers = useCallback((cursor = null) => {
         setIsLoading(true);
-        api.getUsers()
-            .then(data => setUsers(data))
+        api.getUsers({ role: roleFilter, q: search.trim(), cursor })
+            .then(data => {
+                setUsers(prev => (cursor ? [...prev, ...data.items] : data.items));
+                setNextCursor(data.next_cursor);
+            })
             .catch(err => setError(err.message))
             .finally(() => setIsLoading(false));
-    }, []);
+    }, [roleFilter, search]);
 
     useEffect(() => {
         fetchUsers();
@@ -76,8 +82,8 @@ const AdminPage = () => {
 
     const handleRerunAI = async () => {
         try {
-            await api.rerunAiAnalysis();
-            addNotification("AI re-analysis triggered for all tickets.", 'success');
+            const result = await api.rerunAiAnalysis();
+            addNotification(result.message, 'success');
         } catch (err) {
             addNotification(`Failed to trigger AI analysis: ${err.message}`, 'error');
         } finally {
@@ -99,8 +105,23 @@ const AdminPage = () => {
                             🔁 Re-run AI Analysis
                         </button>
                     </div>
+                    <div className="mt-4 flex gap-2">
+                        <input
+                            type="text"
+                            value={search}
+                            onChange={e => setSearch(e.target.value)}
+                            className="border-gray-300 rounded-md text-sm"
+                            placeholder="Username or email starts with..."
+                        />
+                        <select value={roleFilter} onChange={e => setRoleFilter(e.target.value)} className="border-gray-300 rounded-md text-sm">
+                            <option value="">All roles</option>
+                            <option value="user">User</option>
+                            <option value="moderator">Moderator</option>
+                            <option value="admin">Admin</option>
+                        </select>
+                    </div>
                 </div>
-                {isLoading ? (
+                {isLoading && users.length === 0 ? (
                     <div className="p-6 text-center">Loading users...</div>
                 ) : error ? (
                     <div className="p-6 text-center text-red-500">{error}</div>
@@ -144,6 +165,17 @@ const AdminPage = () => {
                                 )}
                             </tbody>
                         </table>
+                        {nextCursor && (
+                            <div className="p-4 text-center">
+                                <button
+                                    onClick={() => fetchUsers(nextCursor)}
+                                    disabled={isLoading}
+                                    className="text-indigo-600 hover:text-indigo-900 text-sm font-semibold disabled:opacity-50"
+                                >
+                                    {isLoading ? 'Loading...' : 'Load more'}
+                                </button>
+                            </div>
+                        )}
                     </div>
                 )}
             </Card>
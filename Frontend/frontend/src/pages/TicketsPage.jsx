@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { PlusCircle, ChevronRight } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
 import { useNotification } from '../context/NotificationContext';
@@ -12,14 +12,20 @@ const CreateTicketModal = ({ isOpen, onClose, onTicketCreated }) => {
     const [description, setDescription] = useState('');
     const [error, setError] = useState('');
     const [isLoading, setIsLoading] = useState(false);
+    const [idempotencyKey, setIdempotencyKey] = useState(() => crypto.randomUUID());
     const { addNotification } = useNotification();
 
+    // Resubmitting the same ticket reuses the key; editing it makes a new request
+    useEffect(() => {
+        setIdempotencyKey(crypto.randomUUID());
+    }, [title, description]);
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         setError('');
         setIsLoading(true);
         try {
-            await api.createTicket(title, description);
+            await api.createTicket(title, description, idempotencyKey);
             addNotification('Ticket created successfully!', 'success');
             onTicketCreated();
             setTitle('');
@@ -73,6 +79,48 @@ const TicketsPage = ({ navigate, params }) => {
         fetchTickets();
     }, [fetchTickets]);
 
+    // Apply pushed ticket events to the list instead of polling. Events only carry the
+    // changed fields, so new tickets and resyncs trigger one debounced refetch.
+    const ticketsRef = useRef(tickets);
+    ticketsRef.current = tickets;
+    useEffect(() => {
+        if (!api.getToken()) return undefined;
+        let refetchTimer = null;
+        const refetchSoon = () => {
+            clearTimeout(refetchTimer);
+            refetchTimer = setTimeout(() => {
+                api.getTickets()
+                    .then(data => setTickets(data))
+                    .catch(err => setError(err.message));
+            }, 1000);
+        };
+
+        const unsubscribe = api.subscribeToTicketEvents((event) => {
+            // A ticket assigned to another moderator leaves this moderator's list
+            const hidden = user.role === 'moderator' && event.assigned_to && event.assigned_to !== user.id;
+            const known = ticketsRef.current.some(ticket => ticket.id === event.ticket_id);
+            if (!known) {
+                // New (or newly visible) ticket, or a resync: the list needs full rows
+                if (!hidden) refetchSoon();
+                return;
+            }
+            if (hidden) {
+                setTickets(current => current.filter(ticket => ticket.id !== event.ticket_id));
+                return;
+            }
+            const { status, priority, assigned_to, version, updated_at } = event;
+            setTickets(current => current.map(ticket =>
+                ticket.id === event.ticket_id && version > (ticket.version ?? 0)
+                    ? { ...ticket, status, priority, assigned_to, version, updated_at }
+                    : ticket
+            ));
+        });
+        return () => {
+            clearTimeout(refetchTimer);
+            unsubscribe();
+        };
+    }, [user.id, user.role]);
+
     return (
         <div>
             <div className="flex justify-between items-center mb-6">
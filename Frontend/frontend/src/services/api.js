@@ -71,13 +71,57 @@ class ApiService {
         return this.request(`/api/tickets/${ticketId}`);
     }
 
-    createTicket(title, description) {
+    // Pass the same idempotencyKey when retrying, so a timed-out create is not duplicated
+    createTicket(title, description, idempotencyKey) {
         return this.request('/api/tickets', {
             method: 'POST',
+            headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
             body: JSON.stringify({ title, description }),
         });
     }
     
+    // Server-sent events for ticket create/update/assign; returns an unsubscribe function.
+    // EventSource cannot send headers, so every connection uses a fresh single-use stream
+    // token in the query string. Tokens cannot be replayed, so instead of the browser's own
+    // reconnect we fetch a new token, and report a 'resync' for the events missed meanwhile.
+    subscribeToTicketEvents(onEvent) {
+        const eventTypes = ['ticket.created', 'ticket.updated', 'ticket.assigned', 'resync'];
+        const handler = (e) => onEvent(e.data ? JSON.parse(e.data) : { type: e.type });
+        let source = null;
+        let retryTimer = null;
+        let closed = false;
+        let connected = false;
+
+        const reconnect = () => {
+            if (!closed) retryTimer = setTimeout(connect, 5000);
+        };
+        const connect = async () => {
+            try {
+                const { stream_token } = await this.request('/api/tickets/events/token', { method: 'POST' });
+                if (closed) return;
+                source = new EventSource(`${API_BASE_URL}/api/tickets/events?stream_token=${encodeURIComponent(stream_token)}`);
+                eventTypes.forEach(type => source.addEventListener(type, handler));
+                source.onopen = () => {
+                    if (connected) onEvent({ type: 'resync' });
+                    connected = true;
+                };
+                source.onerror = () => {
+                    source.close();
+                    reconnect();
+                };
+            } catch (error) {
+                reconnect();
+            }
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retryTimer);
+            if (source) source.close();
+        };
+    }
+
     updateTicketStatus(ticketId, status) {
         return this.request(`/api/tickets/${ticketId}/status`, {
             method: 'PATCH',
@@ -86,8 +130,12 @@ class ApiService {
     }
 
     // --- Admin Endpoints ---
-    getUsers() {
-        return this.request('/api/admin/users');
+    getUsers(params = {}) {
+        // params: { limit, cursor, role, is_active, skill, q } -> { items, next_cursor }
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+        ).toString();
+        return this.request(`/api/admin/users${query ? `?${query}` : ''}`);
     }
     
     getDashboardStats() {
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict
 
 class Settings(BaseSettings):
     # MongoDB Atlas
@@ -12,17 +12,112 @@ class Settings(BaseSettings):
     
     # AI
     gemini_api_key: str = ""
+    gemini_model_names: str = "gemini-flash-lite-latest,gemini-flash-latest"  # ordered, comma separated
+    ai_hedge_delay_seconds: float = 3.0  # used until a model has enough latency samples
+    ai_min_timeout_seconds: float = 5.0
+    ai_max_timeout_seconds: float = 60.0
+    ai_timeout_p95_multiplier: float = 2.0
+    ai_prompt_token_budget: int = 1500  # description tokens sent to the model; longer ones are compacted
+    ai_stack_frames_keep: int = 5  # frame lines kept at each end of a stack trace
+    ai_max_concurrency: int = 16  # AI calls in flight per process; the rest queue by priority
+    ai_scheduler_aging_per_minute: float = 1.0  # pre-score points gained per minute of waiting
     
+    # Tickets
+    bulk_ticket_max_items: int = 500
+    ai_batch_concurrency: int = 8  # concurrent AI triage calls per bulk batch
+
+    assignment_max_open_per_moderator: int = 25  # open + in-progress tickets before a moderator is full; past it tickets wait unassigned
+    assignment_load_weight: float = 1.0  # matched skills a full moderator must beat an idle one by
+
+    ticket_events_heartbeat_seconds: float = 15.0
+    stream_token_ttl_seconds: int = 30  # single-use token for opening the event stream
+
+    # Logging: JSON lines (or "text") written to stdout by a background thread
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_queue_size: int = 10000  # records waiting for the writer; beyond this they are dropped
+    log_rate_limit_per_site: int = 20  # warnings per call site per window, 0 = unlimited
+    log_rate_limit_window_seconds: float = 10.0
+
+    # Triage tracing: spans per request/pipeline step, tail-sampled (slow or failed traces are always kept)
+    tracing_enabled: bool = False
+    tracing_exporter: str = "file"  # "file", "log" or "package.module:ExporterClass"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_slow_ms: float = 2000.0
+    tracing_sample_rate: float = 0.0  # fraction of the other traces to keep
+    tracing_max_spans_per_trace: int = 500
+
+    # Event-loop watchdog: log and keep the stack of anything that blocks the loop longer than the threshold
+    loop_watchdog_enabled: bool = False
+    loop_watchdog_threshold_ms: float = 100.0
+    loop_watchdog_interval_ms: float = 20.0  # heartbeat period (detection granularity)
+    loop_watchdog_stack_depth: int = 30
+    loop_watchdog_max_reports: int = 50
+
+    # Idempotency-Key on ticket creation: replay window, and how long a retry waits for the first request
+    idempotency_ttl_seconds: int = 86400
+    idempotency_lock_seconds: int = 300  # a pending key is taken over after this (its request died)
+    idempotency_wait_seconds: float = 30.0
+
+    # SLA deadlines (minutes from creation, per priority) and escalation
+    sla_enabled: bool = True
+    sla_first_response_minutes: Dict[str, int] = {"urgent": 30, "high": 120, "medium": 480, "low": 1440}
+    sla_resolution_minutes: Dict[str, int] = {"urgent": 240, "high": 1440, "medium": 4320, "low": 10080}
+    sla_escalation_batch_size: int = 100
+    sla_resync_seconds: int = 600  # reload deadlines (e.g. written by other API processes)
+
+    # Archive tier for finished tickets
+    archive_enabled: bool = True
+    archive_closed_after_days: int = 7
+    archive_resolved_after_days: int = 30
+    archive_batch_size: int = 500
+    archive_interval_seconds: int = 3600
+
     # Email
     smtp_host: str = "smtp.mailtrap.io"
     smtp_port: int = 587
     smtp_user: str = ""
     smtp_password: str = ""
+    smtp_use_tls: bool = True
     from_email: str = "dubeyrudra63@gmail.com"
     
     # Redis
     redis_url: str = "redis://localhost:6379/0"
+
+    # Background triage
+    triage_backend: str = "local"  # "local" (in the API process) or "celery" (worker processes)
+    celery_broker_url: str = ""  # defaults to redis_url; "memory://" for local runs
+    triage_max_retries: int = 5
+    triage_lease_seconds: int = 300  # must exceed the worst-case AI + email time
     
+    # Re-triage of tickets with a stale AI analysis (python -m app.retriage)
+    retriage_batch_size: int = 100
+    retriage_concurrency: int = 4
+    retriage_rate_per_second: float = 2.0  # tickets started per second, 0 = unlimited
+
+    # Columnar snapshot export for analytics (python -m app.export)
+    export_dir: str = "exports"
+    export_format: str = "parquet"  # "parquet" or "arrow" (Arrow IPC file)
+    export_batch_size: int = 5000  # documents read and written per file
+    export_safety_lag_seconds: int = 5  # leave the newest writes for the next run
+
+    # Admission control: concurrent requests per route class, then a short queue, then 503
+    admission_enabled: bool = True
+    admission_triage_concurrency: int = 32  # ticket creation (AI triage inline)
+    admission_write_concurrency: int = 64
+    admission_read_concurrency: int = 256
+    admission_admin_concurrency: int = 8
+    admission_max_queue: int = 200  # waiting requests per route class
+    admission_queue_timeout_seconds: float = 2.0  # longest a request may wait for a slot
+
+    # Single-flight reads: identical concurrent reads share one query; results may be reused for the TTL
+    single_flight_stats_ttl_seconds: float = 1.0
+    single_flight_ticket_ttl_seconds: float = 0.0  # >0 can serve a ticket up to this stale
+    single_flight_user_ttl_seconds: float = 0.0  # >0 delays role changes and deactivation by up to this
+
+    # Models
+    trusted_document_fast_path: bool = True  # skip re-validating documents this app wrote
+
     # App
     app_name: str = "AI Ticket System"
     debug: bool = True
@@ -0,0 +1,44 @@
+# app/export.py
+
+"""
+Export tickets (including archived ones) and users as an incremental,
+date-partitioned columnar snapshot for offline analytics. Only documents
+changed since the previous run are written.
+
+    python -m app.export [--dataset tickets] [--format arrow] [--output exports] [--full]
+"""
+
+import argparse
+import asyncio
+import json
+
+from app.utils.structured_logging import configure_logging
+from app.models.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.export_service import ExportService, DATASETS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default=None, help="Export only this dataset")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default=None)
+    parser.add_argument("--output", default=None, help="Export directory")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and export everything")
+    return parser.parse_args()
+
+
+async def main(args):
+    configure_logging()
+    await connect_to_mongo()
+    try:
+        exporter = ExportService(get_database(), export_dir=args.output, file_format=args.format)
+        if args.dataset:
+            summary = {args.dataset: await exporter.export_dataset(args.dataset, full=args.full)}
+        else:
+            summary = await exporter.export_all(full=args.full)
+    finally:
+        await close_mongo_connection()
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -1,20 +1,56 @@
+import time
+_import_started = time.perf_counter()
+
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.models.database import connect_to_mongo, close_mongo_connection
+from app.models.database import connect_to_mongo, close_mongo_connection, get_database
 from app.routes import auth, tickets, admin
 from app.config import settings
 from app.utils.background_tasks import background_tasks
+from app.services.event_service import ticket_events
+from app.services.archive_service import archive_scheduler
+from app.services.sla_service import sla_scheduler
+from app.services.ai_service import ai_service
+from app.services.ai_rerun_service import rerun_job
+from app.services.export_service import export_job
+from app.utils.startup import startup_timer
+from app.utils.admission import AdmissionMiddleware
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.tracing import tracer, TracingMiddleware
+from app.utils.structured_logging import configure_logging, RequestContextMiddleware
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+startup_timer.record("import", time.perf_counter() - _import_started)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Starting up AI Ticket System...")
+    logger.info("🚀 Starting up AI Ticket System...")
     await connect_to_mongo()
+    with startup_timer.phase("background_services"):
+        await ticket_events.start(get_database())
+        await archive_scheduler.start(get_database())
+        await sla_scheduler.start(get_database())
+        await loop_watchdog.start()
+    startup_timer.log_report()
+    # Import the Gemini SDK in a thread after startup instead of on the first ticket
+    background_tasks.add_task(ai_service.warm_up())
     yield
-    print("Shutting down AI Ticket System...")
+    logger.info("👋 Shutting down AI Ticket System...")
+    await loop_watchdog.stop()
+    await rerun_job.stop()
+    await export_job.stop()
+    await sla_scheduler.stop()
+    await archive_scheduler.stop()
+    await ticket_events.stop()
     await background_tasks.wait_for_all()
     await close_mongo_connection()
+    tracer.shutdown()
 
 app = FastAPI(
     title=settings.app_name,
@@ -23,14 +59,22 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Added before CORS so that 503 responses still get CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Adjust for production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "X-Request-Id"],
 )
 
+# Outermost, so request spans include CORS and admission queueing
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(tickets.router, prefix="/api")
 app.include_router(admin.router, prefix="/api")
@@ -47,6 +91,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/startup")
+async def startup_report():
+    return startup_timer.report()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
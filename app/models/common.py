@@ -0,0 +1,89 @@
+from typing import Annotated, Any, Generic, TypeVar
+
+from bson import ObjectId
+from pydantic import BaseModel, GetCoreSchemaHandler, GetJsonSchemaHandler, TypeAdapter
+from pydantic_core import core_schema
+
+from app.config import settings
+
+
+class _ObjectIdPydanticAnnotation:
+    """pydantic 2 core schema for bson.ObjectId: accepts ObjectId or its hex string, dumps to str in JSON."""
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        def validate(value: Any) -> ObjectId:
+            if isinstance(value, ObjectId):
+                return value
+            if isinstance(value, str) and ObjectId.is_valid(value):
+                return ObjectId(value)
+            raise ValueError("Invalid objectid")
+
+        return core_schema.no_info_plain_validator_function(
+            validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json"),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, _core_schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler):
+        return {"type": "string"}
+
+
+PyObjectId = Annotated[ObjectId, _ObjectIdPydanticAnnotation]
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class DocumentAdapter(Generic[ModelT]):
+    """
+    Converts MongoDB documents to a model. Validators are built once at import.
+
+    Documents read back from our own collections were written by this app, so
+    by default they take the trusted fast path (no validation).
+    Set TRUSTED_DOCUMENT_FAST_PATH=false to validate everything.
+    """
+
+    def __init__(self, model: type[ModelT]):
+        self.model = model
+        self._list_adapter = TypeAdapter(list[model])
+        # (attribute name, document key, field) for the construct fast path
+        self._fields = [
+            (name, field.alias or name, field) for name, field in model.model_fields.items()
+        ]
+
+    def validate(self, doc: dict) -> ModelT:
+        return self.model.model_validate(doc)
+
+    def validate_many(self, docs: list[dict]) -> list[ModelT]:
+        return self._list_adapter.validate_python(docs)
+
+    def construct(self, doc: dict) -> ModelT:
+        """
+        Trusted fast path: no validation, unknown keys dropped. Equivalent to
+        model_construct() but without its per-call alias and extras handling.
+        """
+        values = {}
+        fields_set = set()
+        for name, key, field in self._fields:
+            if key in doc:
+                values[name] = doc[key]
+                fields_set.add(name)
+            else:
+                values[name] = field.get_default(call_default_factory=True)
+
+        instance = self.model.__new__(self.model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+    def from_db(self, doc: dict) -> ModelT:
+        if settings.trusted_document_fast_path:
+            return self.construct(doc)
+        return self.validate(doc)
+
+    def many_from_db(self, docs: list[dict]) -> list[ModelT]:
+        if settings.trusted_document_fast_path:
+            return [self.construct(doc) for doc in docs]
+        return self.validate_many(docs)
@@ -1,6 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.config import settings  # Your config with MONGODB_URL
+from app.utils.startup import startup_timer
 import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
 
 class MongoDB:
     client: AsyncIOMotorClient = None
@@ -11,32 +16,87 @@ mongodb = MongoDB()
 async def connect_to_mongo():
     """Connect to MongoDB Atlas and create indexes"""
     try:
-        mongodb.client = AsyncIOMotorClient(settings.mongodb_url)
-        mongodb.database = mongodb.client.get_default_database()
-        await create_indexes()
-        print("Connected to MongoDB Atlas")
+        with startup_timer.phase("mongo_client"):
+            mongodb.client = AsyncIOMotorClient(settings.mongodb_url)
+            mongodb.database = mongodb.client.get_default_database()
+        with startup_timer.phase("indexes"):
+            await create_indexes()
+        logger.info("✅ Connected to MongoDB Atlas")
     except Exception as e:
-        print(f"Failed to connect to MongoDB: {e}")
+        logger.error(f"❌ Failed to connect to MongoDB: {e}")
         raise e
 
 async def close_mongo_connection():
     """Close MongoDB connection"""
     if mongodb.client:
         mongodb.client.close()
-        print("Disconnected from MongoDB Atlas")
+        logger.info("🔌 Disconnected from MongoDB Atlas")
 
-async def create_indexes():
-    """Create necessary indexes on collections for performance"""
+# (collection, keys, options). Any change here changes INDEX_SPEC_VERSION,
+# which makes the next startup (re)create the indexes.
+INDEX_SPECS = [
     # Unique indexes on user email and username
-    await mongodb.database.users.create_index("email", unique=True)
-    await mongodb.database.users.create_index("username", unique=True)
-    
+    ("users", "email", {"unique": True}),
+    ("users", "username", {"unique": True}),
+    # Admin user directory: filters + keyset pagination on _id
+    ("users", [("role", 1), ("is_active", 1), ("_id", 1)], {}),
+    ("users", [("skills", 1), ("_id", 1)], {}),
+    # Columnar export: documents changed since the watermark
+    ("users", "updated_at", {}),
+    ("users", "created_at", {}),
+
     # Indexes on tickets collection for faster queries
-    await mongodb.database.tickets.create_index("created_by")
-    await mongodb.database.tickets.create_index("assigned_to")
-    await mongodb.database.tickets.create_index("status")
-    await mongodb.database.tickets.create_index("priority")
-    await mongodb.database.tickets.create_index("created_at")
+    ("tickets", "created_by", {}),
+    ("tickets", "assigned_to", {}),
+    ("tickets", "status", {}),
+    ("tickets", "priority", {}),
+    ("tickets", "created_at", {}),
+    # Moderator work queue: claim-next sorts unassigned open tickets by urgency then age
+    ("tickets", [("assigned_to", 1), ("status", 1), ("priority_rank", -1), ("created_at", 1)], {}),
+    # Archival job: status + age
+    ("tickets", [("status", 1), ("updated_at", 1)], {}),
+    # SLA scheduler: upcoming deadlines
+    ("tickets", "sla_due_at", {}),
+    # Re-triage: stale ai_version, walked in _id order
+    ("tickets", [("ai_version", 1), ("_id", 1)], {}),
+    # Columnar export: documents changed since the watermark (never-updated ones use created_at)
+    ("tickets", "updated_at", {}),
+
+    # Archive collection (searched by id and, on request, by owner/assignee)
+    ("tickets_archive", "created_by", {}),
+    ("tickets_archive", "assigned_to", {}),
+    ("tickets_archive", "created_at", {}),
+    ("tickets_archive", "updated_at", {}),
+
+    # Idempotency keys expire at their own expires_at
+    ("idempotency_keys", "expires_at", {"expireAfterSeconds": 0}),
+    # Unused event-stream tokens too
+    ("stream_tokens", "expires_at", {"expireAfterSeconds": 0}),
+]
+
+INDEX_SPEC_VERSION = hashlib.sha1(repr(INDEX_SPECS).encode()).hexdigest()
+
+
+async def create_indexes():
+    """
+    Create necessary indexes on collections for performance.
+    All create_index calls run concurrently, and the whole step is skipped
+    when the spec version stored in the `meta` collection is current.
+    """
+    db = mongodb.database
+    stored = await db.meta.find_one({"_id": "index_spec"})
+    if stored and stored.get("version") == INDEX_SPEC_VERSION:
+        return
+
+    await asyncio.gather(*(
+        db[collection].create_index(keys, **options)
+        for collection, keys, options in INDEX_SPECS
+    ))
+    await db.meta.update_one(
+        {"_id": "index_spec"},
+        {"$set": {"version": INDEX_SPEC_VERSION}},
+        upsert=True
+    )
 
 def get_database() -> AsyncIOMotorDatabase:
     if mongodb.database is None:
@@ -1,23 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 from bson import ObjectId
 
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v, field):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid objectid")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, field_schema):
-        field_schema.update(type="string")
+from app.models.common import PyObjectId, DocumentAdapter
 
 class TicketStatus(str, Enum):
     OPEN = "open"
@@ -25,14 +12,38 @@ class TicketStatus(str, Enum):
     RESOLVED = "resolved"
     CLOSED = "closed"
 
+# Allowed status changes (from -> to). Closed is terminal.
+STATUS_TRANSITIONS = {
+    TicketStatus.OPEN: {TicketStatus.IN_PROGRESS, TicketStatus.RESOLVED, TicketStatus.CLOSED},
+    TicketStatus.IN_PROGRESS: {TicketStatus.OPEN, TicketStatus.RESOLVED, TicketStatus.CLOSED},
+    TicketStatus.RESOLVED: {TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.CLOSED},
+    TicketStatus.CLOSED: set(),
+}
+
+def allowed_from_statuses(target: TicketStatus) -> List[str]:
+    """
+    Statuses a ticket may be in to move to `target`. Re-setting the same status is allowed,
+    except for terminal statuses: rewriting a closed ticket would only postpone its archival.
+    """
+    return [
+        source.value for source, targets in STATUS_TRANSITIONS.items()
+        if target in targets or (source == target and targets)
+    ]
+
 class TicketPriority(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
     URGENT = "urgent"
 
+# Numeric priority, stored alongside `priority` so queues can sort by urgency
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
+
+def priority_rank(priority) -> int:
+    return PRIORITY_RANK.get(TicketPriority(priority).value, PRIORITY_RANK["medium"])
+
 class TicketInDB(BaseModel):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
     title: str
     description: str
     status: TicketStatus = TicketStatus.OPEN
@@ -44,11 +55,16 @@ class TicketInDB(BaseModel):
     assigned_to: Optional[str] = None  # user id as string
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None  # for updates
+    version: int = 0  # incremented on every write, used for ETags
+    ai_version: Optional[str] = None  # "<prompt version>:<model>" of the last AI analysis
+    first_response_at: Optional[datetime] = None  # first time the ticket left "open"
+    sla_due_at: Optional[datetime] = None  # next SLA deadline (first response, then resolution)
+    escalation_level: int = 0  # SLA breaches so far
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+# Built once; use for every DB document -> TicketInDB conversion
+ticket_adapter = DocumentAdapter(TicketInDB)
 
 class TicketCreate(BaseModel):
     title: str
@@ -70,7 +86,41 @@ class TicketResponse(BaseModel):
     assigned_to: Optional[str]
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 0
+    ai_version: Optional[str] = None
+    sla_due_at: Optional[datetime] = None
+    escalation_level: int = 0
 
 class TicketStatusUpdate(BaseModel):
     status: TicketStatus
+    expected_version: Optional[int] = None  # reject the update if the ticket changed since this version
+
+
+class TicketBulkCreate(BaseModel):
+    # Items are validated one by one so a bad item does not reject the batch
+    tickets: List[Dict[str, Any]]
+
+class TicketBulkItemResult(BaseModel):
+    index: int
+    success: bool
+    ticket: Optional[TicketResponse] = None
+    error: Optional[str] = None
+
+class TicketBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TicketBulkItemResult]
+
+class TicketBulkStatusUpdate(BaseModel):
+    ticket_ids: List[str]
+    status: TicketStatus
+
+class TicketBulkStatusItemResult(BaseModel):
+    ticket_id: str
+    success: bool
+    error: Optional[str] = None
 
+class TicketBulkStatusUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[TicketBulkStatusItemResult]
@@ -1,23 +1,10 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 from bson import ObjectId
 
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v, field):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid objectid")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, field_schema):
-        field_schema.update(type="string")
+from app.models.common import PyObjectId, DocumentAdapter
 
 class UserRole(str, Enum):
     USER = "user"
@@ -25,7 +12,7 @@ class UserRole(str, Enum):
     ADMIN = "admin"
 
 class UserInDB(BaseModel):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
     email: EmailStr
     username: str
     hashed_password: str
@@ -36,10 +23,10 @@ class UserInDB(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None  # Will be set on updates
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+# Built once; use for every DB document -> UserInDB conversion
+user_adapter = DocumentAdapter(UserInDB)
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -62,6 +49,10 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None  
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
 class UserUpdate(BaseModel):
     user_id: str
     role: UserRole
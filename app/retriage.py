@@ -0,0 +1,47 @@
+# app/retriage.py
+
+"""
+Re-triage tickets whose AI analysis is stale (fallback notes, or a
+PROMPT_VERSION/model that is no longer configured). Resumable: progress is
+checkpointed in the `meta` collection after every batch.
+
+    python -m app.retriage --concurrency 4 --rate 2 [--limit 1000] [--reset]
+"""
+
+import argparse
+import asyncio
+import json
+
+from app.utils.structured_logging import configure_logging
+from app.models.database import connect_to_mongo, close_mongo_connection
+from app.services.ai_rerun_service import retriage_stale_tickets
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None, help="AI calls in flight")
+    parser.add_argument("--rate", type=float, default=None, help="Tickets started per second (0 = unlimited)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many tickets")
+    parser.add_argument("--reset", action="store_true", help="Ignore the saved checkpoint")
+    return parser.parse_args()
+
+
+async def main(args):
+    configure_logging()
+    await connect_to_mongo()
+    try:
+        summary = await retriage_stale_tickets(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            rate_per_second=args.rate,
+            limit=args.limit,
+            reset=args.reset,
+        )
+    finally:
+        await close_mongo_connection()
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from bson import ObjectId
 
-from app.models.user import UserUpdate, UserResponse
+from app.models.user import UserUpdate, UserResponse, UserPage, UserRole
 from app.services.auth_service import auth_service
 from app.routes.auth import get_current_user
-from app.services.ai_rerun_service import run_ai_analysis_and_notify  
+from app.services.ai_rerun_service import rerun_job
+from app.services.ai_service import ai_service
+from app.services.archive_service import ArchiveService
+from app.services.export_service import export_job
+from app.models.database import get_database
+from app.utils.admission import admission_controller
+from app.utils.single_flight import get_single_flight_stats
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.tracing import tracer
+from app.utils.structured_logging import get_logging_stats
+from app.services.sla_service import sla_scheduler
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -18,23 +29,42 @@ def require_admin(current_user=Depends(get_current_user)):
     return current_user
 
 
-# ✅ Get all users (admin only)
-@router.get("/users", response_model=List[UserResponse])
-async def get_all_users(admin_user=Depends(require_admin)):
-    users = await auth_service.get_all_users()
-    return [
-        UserResponse(
-            id=str(user.id),
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            role=user.role,
-            skills=user.skills,
-            is_active=user.is_active,
-            created_at=user.created_at
+# ✅ Paginated user directory (admin only)
+@router.get("/users", response_model=UserPage)
+async def get_all_users(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    skill: Optional[str] = None,
+    q: Optional[str] = Query(None, min_length=1, description="Username or email prefix"),
+    admin_user=Depends(require_admin)
+):
+    if cursor and not ObjectId.is_valid(cursor):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
-        for user in users
-    ]
+
+    users, next_cursor = await auth_service.list_users(
+        limit=limit, cursor=cursor, role=role, is_active=is_active, skill=skill, search=q
+    )
+    return UserPage(
+        items=[
+            UserResponse(
+                id=str(user.id),
+                email=user.email,
+                username=user.username,
+                full_name=user.full_name,
+                role=user.role,
+                skills=user.skills,
+                is_active=user.is_active,
+                created_at=user.created_at
+            )
+            for user in users
+        ],
+        next_cursor=next_cursor
+    )
 
 
 # ✅ Update user role or skills (admin only)
@@ -69,23 +99,103 @@ async def update_user(
 
 
 # ✅ Admin-triggered rerun of AI + email
-@router.post("/rerun-ai", status_code=200)
+@router.post("/rerun-ai", status_code=status.HTTP_202_ACCEPTED)
 async def trigger_rerun_ai(admin_user=Depends(require_admin)):
     """
-    Admin-triggered AI re-analysis of failed tickets only.
+    Admin-triggered AI re-analysis of stale tickets.
 
     ✅ Filters only tickets where:
-        - ai_notes == "AI analysis unavailable. Please review manually."
-        - status != "resolved"
+        - ai_version is missing, a fallback, or from an older prompt/model
+        - status is not resolved or closed
 
-    Re-runs Gemini analysis and notifies moderators via email.
+    Re-runs Gemini analysis and notifies moderators via email (once per analysis).
+    The job runs in the background (one at a time); poll GET /admin/rerun-ai for progress.
+    Long runs are checkpointed; `python -m app.retriage` runs the same job from a shell.
     """
-    try:
-        await run_ai_analysis_and_notify()
-        return {"message": "✅ AI re-analysis of fallback tickets triggered successfully."}
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"❌ Failed to rerun AI analysis: {str(e)}"
-        )
+    started = rerun_job.start()
+    return {
+        "message": "✅ AI re-analysis of stale tickets started." if started
+        else "⏳ AI re-analysis is already running.",
+        **await rerun_job.get_status(),
+    }
+
+
+# ✅ Progress of the AI re-analysis job (from its checkpoint)
+@router.get("/rerun-ai")
+async def get_rerun_ai_status(admin_user=Depends(require_admin)):
+    return await rerun_job.get_status()
+
+
+
+# ✅ Per-model latency / win-rate stats of the AI tier list
+@router.get("/ai-stats")
+async def get_ai_stats(admin_user=Depends(require_admin)):
+    return {
+        "primary_model": ai_service.model_name,
+        "models": ai_service.get_model_stats(),
+        "scheduler": ai_service.get_scheduler_stats(),
+        "prompts": ai_service.get_prompt_stats(),
+    }
+
+
+# ✅ Run the ticket archival job now (it also runs on a schedule)
+@router.post("/archive", status_code=200)
+async def trigger_archive(admin_user=Depends(require_admin)):
+    archived = await ArchiveService(get_database()).archive_tickets()
+    return {"archived": archived}
+
+
+# ✅ Write the columnar analytics snapshot now (only what changed since the last export)
+@router.post("/export", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_export(full: bool = Query(False), admin_user=Depends(require_admin)):
+    """
+    The export runs in the background (one at a time); poll GET /admin/export for the result.
+    `python -m app.export` runs the same export from a shell.
+    """
+    started = export_job.start(get_database(), full=full)
+    return {
+        "message": "✅ Export started." if started else "⏳ An export is already running.",
+        **await export_job.get_status(get_database()),
+    }
+
+
+# ✅ Export job status and per-dataset watermarks
+@router.get("/export")
+async def get_export_status(admin_user=Depends(require_admin)):
+    return await export_job.get_status(get_database())
+
+
+# ✅ Admission control: per-route-class concurrency, queue wait and shed counters
+@router.get("/admission-stats")
+async def get_admission_stats(admin_user=Depends(require_admin)):
+    return admission_controller.get_stats()
+
+
+# ✅ Single-flight reads: how many identical concurrent reads were collapsed
+@router.get("/read-stats")
+async def get_read_stats(admin_user=Depends(require_admin)):
+    return get_single_flight_stats()
+
+
+# ✅ SLA scheduler: tracked deadlines and escalations so far
+@router.get("/sla-stats")
+async def get_sla_stats(admin_user=Depends(require_admin)):
+    return sla_scheduler.get_stats()
+
+
+# ✅ Event-loop watchdog: stalls above the threshold, worst call sites and recent stacks
+@router.get("/loop-stalls")
+async def get_loop_stalls(admin_user=Depends(require_admin)):
+    return loop_watchdog.get_stats()
+
+
+# ✅ Tracing: traces started and exported (tail-sampled)
+@router.get("/trace-stats")
+async def get_trace_stats(admin_user=Depends(require_admin)):
+    return tracer.get_stats()
+
 
+# ✅ Log pipeline: records waiting for the writer thread and records dropped
+@router.get("/logging-stats")
+async def get_log_stats(admin_user=Depends(require_admin)):
+    return get_logging_stats()
@@ -1,27 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 from app.models.user import UserCreate, UserLogin, UserUpdate, UserResponse
 from app.services.auth_service import auth_service
 from app.utils.security import create_access_token, verify_token
+from app.utils.structured_logging import bind_log_context
 from app.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 class Token(BaseModel):
     access_token: str
     token_type: str
     user: dict
 
-# Dependency to get current user
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
+async def _get_user_from_token(token: str):
     email = verify_token(token)
     if email is None:
         raise HTTPException(
@@ -35,6 +33,32 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    bind_log_context(user_id=str(user.id))
+    return user
+
+# Dependency to get current user
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    return await _get_user_from_token(credentials.credentials)
+
+# Same as get_current_user, but also accepts ?stream_token= because browser
+# EventSource connections cannot set an Authorization header. Stream tokens
+# (POST /tickets/events/token) are short-lived and single-use, so the URL
+# never carries the long-lived JWT.
+async def get_current_user_for_stream(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    stream_token: Optional[str] = Query(default=None, max_length=128),
+):
+    if credentials:
+        return await _get_user_from_token(credentials.credentials)
+    user = await auth_service.redeem_stream_token(stream_token) if stream_token else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream token" if stream_token else "Not authenticated"
+        )
+    bind_log_context(user_id=str(user.id))
     return user
 
 # Routes
@@ -1,15 +1,73 @@
 # app/routes/tickets.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import List, Optional
+import asyncio
+import json
 
-from app.models.ticket import TicketCreate, TicketResponse, TicketStatusUpdate
-from app.services.ticket_service import TicketService
-from app.routes.auth import get_current_user
+from app.config import settings
+from app.models.ticket import (
+    TicketInDB,
+    TicketCreate,
+    TicketResponse,
+    TicketStatusUpdate,
+    TicketBulkCreate,
+    TicketBulkItemResult,
+    TicketBulkCreateResponse,
+    TicketBulkStatusUpdate,
+    TicketBulkStatusItemResult,
+    TicketBulkStatusUpdateResponse,
+)
+from app.services.ticket_service import (
+    TicketService, NOT_FOUND, FORBIDDEN, INVALID_TRANSITION, VERSION_CONFLICT
+)
+from app.services.idempotency_service import (
+    IdempotencyService, IdempotencyError, KEY_REUSED, IN_PROGRESS, request_fingerprint
+)
+from app.routes.auth import get_current_user, get_current_user_for_stream
+from app.services.auth_service import auth_service
+from app.services.event_service import ticket_events
 from app.models.database import get_database
+from app.utils.background_tasks import process_tickets_batch_async
+from app.utils.etag import CACHE_CONTROL, make_etag, etag_matches
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
+STATUS_UPDATE_ERROR_RESPONSES = {
+    NOT_FOUND: (status.HTTP_404_NOT_FOUND, "Ticket not found"),
+    FORBIDDEN: (status.HTTP_403_FORBIDDEN, "Not authorized to update this ticket"),
+    INVALID_TRANSITION: (status.HTTP_409_CONFLICT, "Status change not allowed from the ticket's current status"),
+    VERSION_CONFLICT: (status.HTTP_412_PRECONDITION_FAILED, "Ticket was modified by someone else; reload and retry"),
+}
+
+IDEMPOTENCY_ERROR_RESPONSES = {
+    KEY_REUSED: (status.HTTP_422_UNPROCESSABLE_ENTITY, "Idempotency-Key was already used with a different request"),
+    IN_PROGRESS: (status.HTTP_409_CONFLICT, "A request with this Idempotency-Key is still in progress; retry later"),
+}
+
+
+def ticket_to_response(ticket: TicketInDB) -> TicketResponse:
+    return TicketResponse(
+        id=str(ticket.id),
+        title=ticket.title,
+        description=ticket.description,
+        status=ticket.status,
+        priority=ticket.priority,
+        ticket_type=ticket.ticket_type,
+        required_skills=ticket.required_skills,
+        ai_notes=ticket.ai_notes,
+        created_by=ticket.created_by,
+        assigned_to=ticket.assigned_to,
+        created_at=ticket.created_at,
+        updated_at=ticket.updated_at,
+        version=ticket.version,
+        ai_version=ticket.ai_version,
+        sla_due_at=ticket.sla_due_at,
+        escalation_level=ticket.escalation_level,
+    )
+
 
 def get_ticket_service() -> TicketService:
     """
@@ -25,64 +83,203 @@ async def create_ticket(
     ticket_data: TicketCreate,
     current_user=Depends(get_current_user),
     service: TicketService = Depends(get_ticket_service),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
-    """Create a new support ticket"""
-    ticket = await service.create_ticket(
-        ticket_data.title,
-        ticket_data.description,
-        str(current_user.id),
-    )
+    """
+    Create a new support ticket. With an Idempotency-Key header, a retry of the
+    same request returns the original ticket instead of creating another one.
+    """
+    async def create() -> TicketResponse:
+        ticket = await service.create_ticket(
+            ticket_data.title,
+            ticket_data.description,
+            str(current_user.id),
+        )
+        return ticket_to_response(ticket)
 
-    return TicketResponse(
-        id=str(ticket.id),
-        title=ticket.title,
-        description=ticket.description,
-        status=ticket.status,
-        priority=ticket.priority,
-        ticket_type=ticket.ticket_type,
-        required_skills=ticket.required_skills,
-        ai_notes=ticket.ai_notes,
-        created_by=ticket.created_by,
-        assigned_to=ticket.assigned_to,
-        created_at=ticket.created_at,
-        updated_at=ticket.updated_at,
+    if not idempotency_key:
+        return await create()
+
+    async def create_once() -> dict:
+        return (await create()).model_dump(mode="json")
+
+    try:
+        response = await IdempotencyService(service.db).run(
+            f"create_ticket:{current_user.id}",
+            idempotency_key,
+            request_fingerprint(ticket_data.model_dump()),
+            create_once,
+        )
+    except IdempotencyError as e:
+        status_code, detail = IDEMPOTENCY_ERROR_RESPONSES[e.reason]
+        raise HTTPException(status_code=status_code, detail=detail)
+    return TicketResponse.model_validate(response)
+
+
+@router.post("/bulk", response_model=TicketBulkCreateResponse)
+async def create_tickets_bulk(
+    bulk_data: TicketBulkCreate,
+    current_user=Depends(get_current_user),
+    service: TicketService = Depends(get_ticket_service),
+):
+    """Create many tickets in one request; AI triage for the batch runs in the background"""
+    if len(bulk_data.tickets) > settings.bulk_ticket_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_ticket_max_items} tickets per request",
+        )
+
+    results: list[TicketBulkItemResult | None] = [None] * len(bulk_data.tickets)
+    valid_indexes: list[int] = []
+    valid_items: list[tuple[str, str]] = []
+
+    for index, raw_item in enumerate(bulk_data.tickets):
+        try:
+            item = TicketCreate.model_validate(raw_item)
+        except ValidationError as e:
+            results[index] = TicketBulkItemResult(index=index, success=False, error=str(e))
+            continue
+        valid_indexes.append(index)
+        valid_items.append((item.title, item.description))
+
+    inserted = await service.create_tickets_bulk(valid_items, str(current_user.id))
+
+    created_ids: list[str] = []
+    for index, (ticket, error) in zip(valid_indexes, inserted):
+        if ticket is None:
+            results[index] = TicketBulkItemResult(index=index, success=False, error=error)
+            continue
+        created_ids.append(str(ticket.id))
+        results[index] = TicketBulkItemResult(
+            index=index,
+            success=True,
+            ticket=ticket_to_response(ticket),
+        )
+
+    if created_ids:
+        process_tickets_batch_async(created_ids)
+
+    return TicketBulkCreateResponse(
+        created=len(created_ids),
+        failed=len(results) - len(created_ids),
+        results=results,
     )
 
 
+@router.post("/claim-next", response_model=TicketResponse)
+async def claim_next_ticket(
+    current_user=Depends(get_current_user),
+    service: TicketService = Depends(get_ticket_service),
+):
+    """Atomically assign the next unassigned ticket to the caller (moderators and admins only)"""
+    if current_user.role not in ["moderator", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to claim tickets",
+        )
+
+    # Moderators only pick up work matching their skills (just "general" work without
+    # any skills); admins take anything
+    skills = (current_user.skills or []) if current_user.role == "moderator" else None
+    ticket = await service.claim_next_ticket(str(current_user.id), skills)
+    if not ticket:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    return ticket_to_response(ticket)
+
+
 @router.get("/", response_model=List[TicketResponse])
 async def get_tickets(
+    response: Response,
+    include_archived: bool = False,
+    if_none_match: Optional[str] = Header(default=None),
     current_user=Depends(get_current_user),
     service: TicketService = Depends(get_ticket_service),
 ):
     """Get tickets based on user role"""
-    tickets = await service.get_user_tickets(str(current_user.id), current_user.role)
+    # The version marker is read before the list, so a concurrent write can only make
+    # the ETag older than the body (an extra full fetch later), never newer.
+    marker = await service.get_tickets_version()
+    etag = make_etag(current_user.id, current_user.role, int(include_archived), marker)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+
+    tickets = await service.get_user_tickets(str(current_user.id), current_user.role, include_archived)
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return [
-        TicketResponse(
-            id=str(ticket.id),
-            title=ticket.title,
-            description=ticket.description,
-            status=ticket.status,
-            priority=ticket.priority,
-            ticket_type=ticket.ticket_type,
-            required_skills=ticket.required_skills,
-            ai_notes=ticket.ai_notes,
-            created_by=ticket.created_by,
-            assigned_to=ticket.assigned_to,
-            created_at=ticket.created_at,
-            updated_at=ticket.updated_at,
-        )
+        ticket_to_response(ticket)
         for ticket in tickets
     ]
 
 
+@router.post("/events/token")
+async def create_stream_token(current_user=Depends(get_current_user)):
+    """Single-use token for opening GET /events from a browser EventSource."""
+    return {
+        "stream_token": await auth_service.issue_stream_token(str(current_user.id)),
+        "expires_in": settings.stream_token_ttl_seconds,
+    }
+
+
+@router.get("/events")
+async def stream_ticket_events(
+    request: Request,
+    current_user=Depends(get_current_user_for_stream),
+):
+    """
+    Server-sent events for ticket create / update / assign, filtered by the
+    same visibility rules as the ticket list. Replaces polling GET /tickets.
+    """
+    subscriber = ticket_events.subscribe(str(current_user.id), current_user.role)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=settings.ticket_events_heartbeat_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            ticket_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(
     ticket_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
     current_user=Depends(get_current_user),
     service: TicketService = Depends(get_ticket_service),
 ):
     """Get a specific ticket"""
+    if if_none_match:
+        # Check the version with a projected lookup before loading the full document
+        meta = await service.get_ticket_version(ticket_id)
+        if meta and not (current_user.role == "user" and meta.get("created_by") != str(current_user.id)):
+            etag = make_etag(ticket_id, meta.get("version", 0))
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+                )
+
     ticket = await service.get_ticket_by_id(ticket_id)
     if not ticket:
         raise HTTPException(
@@ -97,58 +294,75 @@ async def get_ticket(
             detail="Not authorized to view this ticket",
         )
 
-    return TicketResponse(
-        id=str(ticket.id),
-        title=ticket.title,
-        description=ticket.description,
-        status=ticket.status,
-        priority=ticket.priority,
-        ticket_type=ticket.ticket_type,
-        required_skills=ticket.required_skills,
-        ai_notes=ticket.ai_notes,
-        created_by=ticket.created_by,
-        assigned_to=ticket.assigned_to,
-        created_at=ticket.created_at,
-        updated_at=ticket.updated_at,
-    )
+    response.headers["ETag"] = make_etag(ticket.id, ticket.version)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return ticket_to_response(ticket)
 
 
-@router.patch("/{ticket_id}/status")
-async def update_ticket_status(
-    ticket_id: str,
-    status_update: TicketStatusUpdate,
+@router.patch("/bulk/status", response_model=TicketBulkStatusUpdateResponse)
+async def update_ticket_status_bulk(
+    bulk_update: TicketBulkStatusUpdate,
     current_user=Depends(get_current_user),
     service: TicketService = Depends(get_ticket_service),
 ):
-    """Update ticket status (moderators and admins only)"""
+    """Update the status of many tickets at once (moderators and admins only)"""
     if current_user.role not in ["moderator", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update ticket status",
         )
 
-    ticket = await service.get_ticket_by_id(ticket_id)
-    if not ticket:
+    if len(bulk_update.ticket_ids) > settings.bulk_ticket_max_items:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_ticket_max_items} tickets per request",
         )
 
-    # Check if moderator is assigned to this ticket
-    if current_user.role == "moderator" and ticket.assigned_to != str(current_user.id):
+    # Moderators may only update tickets assigned to them
+    moderator_id = str(current_user.id) if current_user.role == "moderator" else None
+    outcomes = await service.update_ticket_status_bulk(
+        bulk_update.ticket_ids, bulk_update.status, moderator_id
+    )
+
+    results = [
+        TicketBulkStatusItemResult(ticket_id=ticket_id, success=error is None, error=error)
+        for ticket_id, error in outcomes.items()
+    ]
+    updated = sum(1 for result in results if result.success)
+    return TicketBulkStatusUpdateResponse(
+        updated=updated,
+        failed=len(results) - updated,
+        results=results,
+    )
+
+
+@router.patch("/{ticket_id}/status")
+async def update_ticket_status(
+    ticket_id: str,
+    status_update: TicketStatusUpdate,
+    current_user=Depends(get_current_user),
+    service: TicketService = Depends(get_ticket_service),
+):
+    """
+    Update ticket status (moderators and admins only).
+    Transitions follow STATUS_TRANSITIONS; pass expected_version for optimistic concurrency.
+    """
+    if current_user.role not in ["moderator", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this ticket",
+            detail="Not authorized to update ticket status",
         )
 
-    success = await service.update_ticket_status(ticket_id, status_update.status)
-    if not success:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update ticket status",
-        )
+    # Moderators may only update tickets assigned to them (checked inside the update)
+    moderator_id = str(current_user.id) if current_user.role == "moderator" else None
+    updated_doc, error = await service.update_ticket_status(
+        ticket_id, status_update.status, moderator_id, status_update.expected_version
+    )
+    if error:
+        status_code, detail = STATUS_UPDATE_ERROR_RESPONSES[error]
+        raise HTTPException(status_code=status_code, detail=detail)
 
-    return {"message": "Ticket status updated successfully"}
+    return {"message": "Ticket status updated successfully", "version": updated_doc["version"]}
 
 
 @router.get("/stats/dashboard")
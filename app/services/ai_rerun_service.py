@@ -1,46 +1,86 @@
+import asyncio
 import logging
+import time
+from datetime import datetime
+
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 
+from app.config import settings
 from app.services.ai_service import ai_service
 from app.services.email_service import email_service
-from app.config import settings
+from app.models.ticket import TicketStatus, priority_rank
+from app.services.event_service import ticket_events, ticket_event, record_ticket_change, TICKET_UPDATED
+from app.services.ticket_service import notification_key
+from app.services.sla_service import sla_scheduler, sla_fields
+from app.models.database import get_database
+from app.utils.structured_logging import bind_log_context
 
 logger = logging.getLogger(__name__)
 
-# MongoDB setup
-client = AsyncIOMotorClient(settings.mongodb_url)
-db = client.get_default_database()
-tickets = db["tickets"]
-users = db["users"]
+CHECKPOINT_ID = "retriage"
+
+
+def stale_query() -> dict:
+    """Unfinished tickets whose AI analysis is missing, a fallback, or from an old prompt/model."""
+    return {
+        "ai_version": {"$nin": ai_service.current_versions()},
+        "status": {"$nin": [TicketStatus.RESOLVED, TicketStatus.CLOSED]},
+    }
 
 
-async def process_ticket(ticket: dict):
+async def process_ticket(ticket: dict) -> bool:
+    """Re-analyze one ticket and notify its moderator once. Returns True if it was updated."""
+    db = get_database()
+    tickets = db["tickets"]
+    users = db["users"]
     _id = ticket.get("_id")
     title = ticket.get("title", "")
     description = ticket.get("description", "")
     assigned_to = ticket.get("assigned_to")
+    bind_log_context(ticket_id=str(_id))
 
     if not title or not description:
         logger.warning(f"⚠️ Skipping ticket {_id} (missing title/description).")
-        return
+        return False
 
     try:
         # 🔍 Step 1: Run Gemini AI
         ai_result = await ai_service.analyze_ticket(title, description)
 
-        # 🧠 Step 2: Update ticket in DB
+        # 🧠 Step 2: Update ticket in DB (the assignment is kept)
         update_fields = {
             "priority": ai_result["priority"],
+            "priority_rank": priority_rank(ai_result["priority"]),
             "ticket_type": ai_result["ticket_type"],
             "required_skills": ai_result["required_skills"],
             "ai_notes": ai_result["helpful_notes"],
+            "ai_version": ai_result["ai_version"],
+            "updated_at": datetime.utcnow(),
         }
-        await tickets.update_one({"_id": _id}, {"$set": update_fields})
-        logger.info(f"✅ Ticket {_id} updated with Gemini AI insights.")
-
-        # 📩 Step 3: Notify assigned moderator
+        if ticket.get("created_at"):
+            update_fields.update(sla_fields(
+                ai_result["priority"], ticket["created_at"], ticket.get("status"),
+                ticket.get("first_response_at") is not None
+            ))
         if assigned_to:
+            update_fields["notified"] = notification_key(assigned_to, ai_result["ai_version"])
+        previous = await tickets.find_one_and_update(
+            {"_id": _id},
+            {"$set": update_fields, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous:
+            return False
+        await record_ticket_change(db)
+        ticket_events.publish_local(ticket_event(TICKET_UPDATED, {
+            **previous, **update_fields, "version": previous.get("version", 0) + 1
+        }))
+        sla_scheduler.track(_id, update_fields.get("sla_due_at"))
+        logger.info(f"✅ Ticket {_id} updated with Gemini AI insights ({ai_result['ai_version']}).")
+
+        # 📩 Step 3: Notify assigned moderator, unless an earlier (interrupted) run already did
+        if assigned_to and previous.get("notified") != update_fields["notified"]:
             moderator = await users.find_one({"_id": ObjectId(assigned_to)})
             if moderator and moderator.get("email"):
                 await email_service.send_ticket_assignment_email(
@@ -54,25 +94,154 @@ async def process_ticket(ticket: dict):
                     }
                 )
                 logger.info(f"📨 Email sent to moderator {moderator.get('email')}")
+        return True
 
     except Exception as e:
         logger.error(f"❌ Error processing ticket {_id}: {e}")
+        return False
 
 
-async def run_ai_analysis_and_notify():
+async def retriage_stale_tickets(
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    rate_per_second: float | None = None,
+    limit: int | None = None,
+    reset: bool = False,
+) -> dict:
     """
-    Admin-triggered: Re-analyze tickets that have fallback AI notes and are unresolved.
+    Re-analyze stale tickets in _id order, one batch at a time. After every batch
+    the last _id is saved in meta.retriage, so an interrupted run resumes where it
+    stopped (the checkpoint is dropped when the target versions change, on reset,
+    and once a run finishes). `concurrency` caps AI calls in flight and
+    `rate_per_second` caps how fast tickets are started (0 = no cap).
     """
-    filter_query = {
-        "ai_notes": "AI analysis unavailable. Please review manually.",
-        "status": {"$ne": "resolved"}
+    batch_size = batch_size or settings.retriage_batch_size
+    concurrency = concurrency or settings.retriage_concurrency
+    rate_per_second = settings.retriage_rate_per_second if rate_per_second is None else rate_per_second
+
+    db = get_database()
+    target = sorted(ai_service.current_versions())
+    checkpoint = await db.meta.find_one({"_id": CHECKPOINT_ID})
+    if reset or not checkpoint or checkpoint.get("target") != target:
+        checkpoint = {"_id": CHECKPOINT_ID, "target": target, "last_id": None, "processed": 0, "updated": 0}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+    next_start = time.monotonic()
+    run_processed = 0
+    finished = False
+
+    async def one(ticket: dict) -> bool:
+        async with semaphore:
+            return await process_ticket(ticket)
+
+    while limit is None or run_processed < limit:
+        query = stale_query()
+        if checkpoint["last_id"] is not None:
+            query["_id"] = {"$gt": checkpoint["last_id"]}
+        size = batch_size if limit is None else min(batch_size, limit - run_processed)
+        batch = await db.tickets.find(query).sort("_id", 1).limit(size).to_list(length=size)
+        if not batch:
+            finished = True
+            break
+
+        tasks = []
+        for ticket in batch:
+            if interval:
+                delay = next_start - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_start = max(next_start, time.monotonic()) + interval
+            tasks.append(asyncio.create_task(one(ticket)))
+        results = await asyncio.gather(*tasks)
+
+        run_processed += len(batch)
+        checkpoint["last_id"] = batch[-1]["_id"]
+        checkpoint["processed"] += len(batch)
+        checkpoint["updated"] += sum(results)
+        checkpoint["checkpointed_at"] = datetime.utcnow()
+        await db.meta.replace_one({"_id": CHECKPOINT_ID}, checkpoint, upsert=True)
+        logger.info(f"🔁 Re-triaged {checkpoint['processed']} ticket(s) so far (last id {checkpoint['last_id']}).")
+
+        if len(batch) < size:
+            finished = True
+            break
+
+    if finished:
+        # Start from the beginning next time (new fallbacks may have appeared)
+        await db.meta.delete_one({"_id": CHECKPOINT_ID})
+
+    return {
+        "target_versions": target,
+        "processed": checkpoint["processed"],
+        "updated": checkpoint["updated"],
+        "finished": finished,
     }
 
-    count = 0
-    cursor = tickets.find(filter_query)
 
-    async for ticket in cursor:
-        await process_ticket(ticket)
-        count += 1
+async def run_ai_analysis_and_notify() -> dict:
+    """
+    Admin-triggered: re-analyze unfinished tickets whose AI analysis is stale
+    (fallback notes, or an older prompt/model version).
+    """
+    summary = await retriage_stale_tickets()
+    logger.info(f"🔁 AI re-analysis complete. {summary['updated']} ticket(s) updated.")
+    return summary
+
+
+class RerunJob:
+    """
+    The admin re-analysis as a background job in this process: at most one run
+    at a time, progress read from the meta.retriage checkpoint. Stopping it
+    (shutdown) only loses the batch in flight; the next run resumes from there.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.started_at: datetime | None = None
+        self.last_result: dict | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Start a run unless one is already going. Returns True if this call started it."""
+        if self.running:
+            return False
+        self.started_at = datetime.utcnow()
+        # Not a background_tasks task: that would hold the triggering request's trace open for the whole run
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self):
+        try:
+            summary = await run_ai_analysis_and_notify()
+            self.last_result = {"finished_at": datetime.utcnow(), **summary}
+        except Exception as e:
+            logger.error(f"❌ AI re-analysis failed: {e}")
+            self.last_result = {"finished_at": datetime.utcnow(), "error": str(e)}
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def get_status(self) -> dict:
+        checkpoint = await get_database().meta.find_one({"_id": CHECKPOINT_ID})
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "progress": {
+                "processed": checkpoint["processed"],
+                "updated": checkpoint["updated"],
+                "checkpointed_at": checkpoint.get("checkpointed_at"),
+            } if checkpoint else None,
+            "last_result": self.last_result,
+        }
+
 
-    logger.info(f"🔁 AI re-analysis complete. {count} ticket(s) updated.")
+rerun_job = RerunJob()
@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from collections import deque
+
+from app.config import settings
+from app.utils.tracing import tracer
+
+# Cheap keyword heuristics: (pattern, score). The highest matching score counts.
+_KEYWORD_SCORES = [
+    (re.compile(r"\b(production|prod|site|service|system)\s+(is\s+)?down\b|\boutage\b|\bdata\s+loss\b|"
+                r"\bsecurity\s+(breach|incident)\b|\bbreach\b|\bsev\s*[01]\b|\bp0\b", re.I), 10.0),
+    (re.compile(r"\burgent\b|\bcritical\b|\bcannot\s+(log\s*in|login|access|pay)\b|\bcrash(es|ed|ing)?\b|"
+                r"\bblock(ed|er|ing)\b|\bpayment\s+failed\b", re.I), 5.0),
+    (re.compile(r"\bfeature\s+request\b|\bsuggestion\b|\bquestion\b|\btypo\b|\bnice\s+to\s+have\b|"
+                r"\bcosmetic\b", re.I), -3.0),
+]
+
+_ROLE_SCORES = {"admin": 2.0, "moderator": 1.0}
+
+PRIORITY_CLASSES = ("urgent", "high", "normal", "low")
+
+
+def pre_score(title: str, description: str, reporter_role: str | None = None) -> tuple[float, str]:
+    """
+    Score a ticket before AI analysis. Returns (score, priority class).
+    Only the first few KB of the description are scanned to keep this cheap.
+    """
+    text = f"{title}\n{description[:4096]}"
+    matched = [score for pattern, score in _KEYWORD_SCORES if pattern.search(text)]
+    keyword_score = max(matched) if matched else 0.0
+
+    score = keyword_score + _ROLE_SCORES.get(str(getattr(reporter_role, "value", reporter_role)), 0.0)
+
+    if score >= 10:
+        return score, "urgent"
+    if score >= 5:
+        return score, "high"
+    if score >= 0:
+        return score, "normal"
+    return score, "low"
+
+
+class _ClassStats:
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.waits = deque(maxlen=window)
+        self.totals = deque(maxlen=window)
+
+    @staticmethod
+    def _pct(values, pct: float):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))], 4)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "wait_p50_seconds": self._pct(self.waits, 0.50),
+            "wait_p95_seconds": self._pct(self.waits, 0.95),
+            "total_p50_seconds": self._pct(self.totals, 0.50),
+            "total_p95_seconds": self._pct(self.totals, 0.95),
+        }
+
+
+class AIScheduler:
+    """
+    Priority queue in front of the AI provider, limited to `max_concurrency`
+    calls in flight. Waiting calls are ordered by pre-score plus aging: every
+    second of waiting adds `aging_per_second`, so low-priority work cannot starve.
+
+    With a uniform aging rate, score + rate * (now - enqueued) orders the same as
+    score - rate * enqueued, so a plain heap with a fixed key is enough.
+    """
+
+    def __init__(self, max_concurrency: int, aging_per_second: float):
+        self.max_concurrency = max_concurrency
+        self.aging_per_second = aging_per_second
+        self._active = 0
+        self._waiting: list = []
+        self._sequence = itertools.count()
+        self._stats = {name: _ClassStats() for name in PRIORITY_CLASSES}
+
+    async def run(self, score: float, priority_class: str, coro_factory):
+        """Wait for a slot in priority order, then await coro_factory()."""
+        enqueued = time.monotonic()
+        with tracer.span("ai.scheduler_wait", priority_class=priority_class):
+            await self._acquire(score, enqueued)
+        started = time.monotonic()
+        try:
+            return await coro_factory()
+        finally:
+            self._release()
+            stats = self._stats[priority_class]
+            stats.count += 1
+            stats.waits.append(started - enqueued)
+            stats.totals.append(time.monotonic() - enqueued)
+
+    async def _acquire(self, score: float, enqueued: float):
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        key = -(score - self.aging_per_second * enqueued)
+        heapq.heappush(self._waiting, (key, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                # Hand the slot straight to the next waiter (active count unchanged)
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def get_stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "waiting": len(self._waiting),
+            "classes": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
+
+
+ai_scheduler = AIScheduler(
+    max_concurrency=settings.ai_max_concurrency,
+    aging_per_second=settings.ai_scheduler_aging_per_minute / 60.0,
+)
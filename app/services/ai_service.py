@@ -1,30 +1,231 @@
-import google.generativeai as genai
 import json
 import re
+import time
 import asyncio
 import logging
+import threading
+from collections import deque
 from app.config import settings
+from app.services.ai_scheduler import ai_scheduler, pre_score
+from app.utils.prompt_compaction import compact_description, estimate_tokens
+from app.utils.tracing import tracer, traced
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt or the response parsing changes; stale tickets can then be re-triaged
+PROMPT_VERSION = "triage-v1"
+FALLBACK_MODEL = "fallback"
+
+
+class AIUnavailableError(Exception):
+    """Every model failed and the caller asked not to settle for the fallback analysis."""
+
+
+class ModelStats:
+    """Rolling latency window plus call/win counters for one model."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.latencies = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.calls = 0
+        self.wins = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def record_usage(self, response, prompt: str):
+        """Token usage from the response metadata, or an estimate if the SDK gives none."""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        self.prompt_tokens += prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+        if output_tokens is not None:
+            self.output_tokens += output_tokens
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def p95(self) -> float | None:
+        """Observed p95 latency, or None until there are enough samples."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.latencies)
+        p50 = ordered[len(ordered) // 2] if ordered else None
+        p95 = self.p95()
+        return {
+            "calls": self.calls,
+            "wins": self.wins,
+            "win_rate": round(self.wins / self.calls, 4) if self.calls else 0.0,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+        }
+
+
+class ModelProvider:
+    """
+    One generative model in the ordered tier list.
+    Wraps the SDK call and keeps the per-model stats used for adaptive timeouts.
+    """
+
+    def __init__(self, name: str, model):
+        self.name = name
+        self.model = model
+        self.stats = ModelStats()
+
+    def timeout(self) -> float:
+        """p95-based timeout, clamped to the configured bounds."""
+        p95 = self.stats.p95()
+        if p95 is None:
+            return settings.ai_max_timeout_seconds
+        return min(
+            settings.ai_max_timeout_seconds,
+            max(settings.ai_min_timeout_seconds, p95 * settings.ai_timeout_p95_multiplier),
+        )
+
+    def hedge_delay(self) -> float:
+        """How long to wait on this model before hedging to the next one."""
+        p95 = self.stats.p95()
+        return p95 if p95 is not None else settings.ai_hedge_delay_seconds
+
+    @traced("ai.generate")
+    async def generate(self, prompt: str) -> str:
+        """Return the raw response text. Raises on error or timeout."""
+        tracer.set_attributes(model=self.name)
+        self.stats.calls += 1
+        start = time.perf_counter()
+        try:
+            if hasattr(self.model, "generate_content_async"):
+                call = self.model.generate_content_async(prompt)
+            else:
+                # Executor calls cannot be interrupted; cancelling only stops waiting on them
+                loop = asyncio.get_running_loop()
+                call = loop.run_in_executor(None, lambda: self.model.generate_content(prompt))
+            response = await asyncio.wait_for(call, timeout=self.timeout())
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            self.stats.cancelled += 1
+            raise
+        except Exception:
+            self.stats.failures += 1
+            raise
+        self.stats.record_latency(time.perf_counter() - start)
+        self.stats.record_usage(response, prompt)
+        return response.parts[0].text.strip()
+
 
 class AIService:
     def __init__(self):
-        self.model_name = getattr(settings, "gemini_model_name", "gemini-flash-lite-latest")
-        if settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(self.model_name)
-        else:
-            logger.error("❌ Gemini API key not found.")
-            self.model = None
+        self.model_names = [n.strip() for n in settings.gemini_model_names.split(",") if n.strip()]
+        self.model_name = self.model_names[0] if self.model_names else None
+        # Built on first use so importing the app does not import the Gemini SDK
+        self._providers: list[ModelProvider] | None = None
+        self._providers_lock = threading.Lock()
 
         self.allowed_priorities = {"low", "medium", "high", "urgent"}
         self.allowed_ticket_types = {"bug", "feature", "support", "technical", "other"}
 
-    async def analyze_ticket(self, title: str, description: str) -> dict:
-        if not self.model:
-            return self._fallback_analysis()
+        # Prompt size accounting, to show what compaction saves
+        self.prompt_stats = {
+            "calls": 0,
+            "compacted_calls": 0,
+            "description_tokens_in": 0,
+            "description_tokens_sent": 0,
+            "compaction_seconds": 0.0,
+        }
+
+    @property
+    def providers(self) -> list[ModelProvider]:
+        if self._providers is None:
+            with self._providers_lock:
+                if self._providers is None:
+                    self._providers = self._build_providers()
+        return self._providers
+
+    def _build_providers(self) -> list[ModelProvider]:
+        if not settings.gemini_api_key:
+            logger.error("❌ Gemini API key not found.")
+            return []
+        import google.generativeai as genai  # heavy SDK, imported on first use
+
+        genai.configure(api_key=settings.gemini_api_key)
+        return [ModelProvider(name, genai.GenerativeModel(name)) for name in self.model_names]
+
+    async def warm_up(self):
+        """Build the providers (and import the SDK) off the event loop, ahead of the first ticket."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.providers)
+
+    def set_models(self, models: dict):
+        """Replace the tier list with {name: model} (primary first)."""
+        self._providers = [ModelProvider(name, model) for name, model in models.items()]
+        self.model_names = list(models)
+        self.model_name = self._providers[0].name if self._providers else None
+
+    def get_model_stats(self) -> dict:
+        return {provider.name: provider.stats.as_dict() for provider in self._providers or []}
 
+    def get_scheduler_stats(self) -> dict:
+        return ai_scheduler.get_stats()
+
+    def get_prompt_stats(self) -> dict:
+        stats = dict(self.prompt_stats)
+        stats["description_tokens_saved"] = stats["description_tokens_in"] - stats["description_tokens_sent"]
+        stats["compaction_seconds"] = round(stats["compaction_seconds"], 4)
+        return stats
+
+    def _prepare_description(self, description: str) -> str:
+        """Compact long descriptions to the token budget (the stored ticket is untouched)."""
+        start = time.perf_counter()
+        compacted = compact_description(
+            description, settings.ai_prompt_token_budget, settings.ai_stack_frames_keep
+        )
+        stats = self.prompt_stats
+        stats["calls"] += 1
+        stats["compaction_seconds"] += time.perf_counter() - start
+        stats["description_tokens_in"] += estimate_tokens(description)
+        stats["description_tokens_sent"] += estimate_tokens(compacted)
+        if compacted is not description:
+            stats["compacted_calls"] += 1
+        return compacted
+
+    @staticmethod
+    def analysis_version(model: str) -> str:
+        return f"{PROMPT_VERSION}:{model}"
+
+    def current_versions(self) -> list[str]:
+        """ai_version values that count as up to date (any configured model, current prompt)."""
+        return [self.analysis_version(name) for name in self.model_names]
+
+    @traced("ai.analyze")
+    async def analyze_ticket(self, title: str, description: str, reporter_role: str | None = None) -> dict:
+        """Triage result, stamped with `model` and `ai_version` (prompt version + model)."""
+        if not self.providers:
+            result = self._fallback_analysis()
+        else:
+            # Urgent-looking tickets get Gemini capacity first when calls are queued
+            score, priority_class = pre_score(title, description, reporter_role)
+            result = await ai_scheduler.run(
+                score, priority_class, lambda: self._analyze(title, description)
+            )
+        result["ai_version"] = self.analysis_version(result["model"])
+        tracer.set_attributes(ai_version=result["ai_version"])
+        return result
+
+    async def _analyze(self, title: str, description: str) -> dict:
+        description = self._prepare_description(description)
         prompt = f"""
 You are an AI ticket triage assistant.
 
@@ -43,66 +244,114 @@ Respond like this:
 """
 
         try:
-            loop = asyncio.get_event_loop()
-            response = await asyncio.wait_for(
-                loop.run_in_executor(None, lambda: self.model.generate_content(prompt)),
-                timeout=60
-            )
-
-            # Step 1: Extract clean text
-            try:
-                response_text = response.parts[0].text.strip()
-                logger.debug(f"🧪 RAW GEMINI: {response_text}")
-                # Clean markdown if present
-                if response_text.startswith("```json"):
-                    response_text = response_text.replace("```json", "").replace("```", "").strip()
-                elif response_text.startswith("```"):
-                    response_text = response_text.replace("```", "").strip()
-            except Exception as e:
-                logger.error(f"Error accessing Gemini response text: {e}")
-                return self._fallback_analysis()
-
-            # Step 2: Extract JSON
-            try:
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if not json_match:
-                    raise ValueError("No JSON found in response")
-                json_str = json_match.group()
-                logger.debug(f"🎯 Extracted JSON: {json_str}")
-                data = json.loads(json_str)
-            except Exception as e:
-                logger.warning(f"❌ JSON parse failed: {e}")
-                return self._fallback_analysis()
-
-            # Step 3: Validate structure
-            if data.get("priority") not in self.allowed_priorities:
-                logger.warning(f"⚠️ Invalid priority: {data.get('priority')}")
-                data["priority"] = "medium"
-
-            if data.get("ticket_type") not in self.allowed_ticket_types:
-                logger.warning(f"⚠️ Invalid ticket_type: {data.get('ticket_type')}")
-                data["ticket_type"] = "support"
-
-            if not isinstance(data.get("required_skills"), list):
-                logger.warning(f"⚠️ Invalid skills format: {data.get('required_skills')}")
-                data["required_skills"] = ["general"]
-
-            return data
-
-        except asyncio.TimeoutError:
-            logger.error("⏱️ Gemini timed out.")
-            return self._fallback_analysis()
+            data = await self._hedged_generate(prompt)
         except Exception as e:
             logger.error(f"💥 Unexpected AI error: {e}")
             return self._fallback_analysis()
 
+        if data is None:
+            return self._fallback_analysis()
+        return data
+
+    async def _hedged_generate(self, prompt: str) -> dict | None:
+        """
+        Call the primary model; if it has not produced valid JSON within its
+        hedge delay (or fails), launch the next model in the tier list.
+        The first valid JSON wins and every other in-flight call is cancelled.
+        """
+        pending: dict[asyncio.Task, ModelProvider] = {}
+        next_index = 0
+
+        def launch_next():
+            nonlocal next_index
+            provider = self.providers[next_index]
+            next_index += 1
+            pending[asyncio.create_task(provider.generate(prompt))] = provider
+            return provider
+
+        current = launch_next()
+        try:
+            while pending:
+                can_hedge = next_index < len(self.providers)
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=current.hedge_delay() if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    logger.info(f"🔀 {current.name} slower than hedge delay, hedging to next model.")
+                    current = launch_next()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    data = self._result_to_analysis(task, provider)
+                    if data is not None:
+                        provider.stats.wins += 1
+                        data["model"] = provider.name
+                        return data
+
+                # Every call that finished was unusable; try the next tier right away
+                if can_hedge:
+                    current = launch_next()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _result_to_analysis(self, task: asyncio.Task, provider: ModelProvider) -> dict | None:
+        if task.exception() is not None:
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                logger.error(f"⏱️ {provider.name} timed out.")
+            else:
+                logger.error(f"💥 {provider.name} error: {error}")
+            return None
+        return self._parse_response(task.result())
+
+    def _parse_response(self, response_text: str) -> dict | None:
+        """Extract and validate the triage JSON. Returns None if unusable."""
+        logger.debug(f"🧪 RAW GEMINI: {response_text}")
+        # Clean markdown if present
+        if response_text.startswith("```json"):
+            response_text = response_text.replace("```json", "").replace("```", "").strip()
+        elif response_text.startswith("```"):
+            response_text = response_text.replace("```", "").strip()
+
+        try:
+            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            if not json_match:
+                raise ValueError("No JSON found in response")
+            json_str = json_match.group()
+            logger.debug(f"🎯 Extracted JSON: {json_str}")
+            data = json.loads(json_str)
+        except Exception as e:
+            logger.warning(f"❌ JSON parse failed: {e}")
+            return None
+
+        if data.get("priority") not in self.allowed_priorities:
+            logger.warning(f"⚠️ Invalid priority: {data.get('priority')}")
+            data["priority"] = "medium"
+
+        if data.get("ticket_type") not in self.allowed_ticket_types:
+            logger.warning(f"⚠️ Invalid ticket_type: {data.get('ticket_type')}")
+            data["ticket_type"] = "support"
+
+        if not isinstance(data.get("required_skills"), list):
+            logger.warning(f"⚠️ Invalid skills format: {data.get('required_skills')}")
+            data["required_skills"] = ["general"]
+
+        return data
+
     def _fallback_analysis(self):
         logger.warning("⚠️ Using fallback analysis.")
         return {
             "required_skills": ["general"],
             "priority": "medium",
             "ticket_type": "support",
-            "helpful_notes": "AI analysis unavailable. Please review manually."
+            "helpful_notes": "AI analysis unavailable. Please review manually.",
+            "model": FALLBACK_MODEL,
         }
 
 
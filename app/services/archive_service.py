@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.models.ticket import TicketStatus
+from app.services.event_service import record_ticket_change
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """
+    Moves closed and long-resolved tickets from the hot `tickets` collection
+    into `tickets_archive` in batches, so everyday queries only touch open work.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _archivable_query(self, now: datetime) -> dict:
+        closed_cutoff = now - timedelta(days=settings.archive_closed_after_days)
+        resolved_cutoff = now - timedelta(days=settings.archive_resolved_after_days)
+        return {"$or": [
+            {"status": TicketStatus.CLOSED, "updated_at": {"$lt": closed_cutoff}},
+            {"status": TicketStatus.RESOLVED, "updated_at": {"$lt": resolved_cutoff}},
+        ]}
+
+    async def archive_tickets(self, batch_size: int | None = None) -> int:
+        """
+        Archive every eligible ticket, one batch at a time. Safe to re-run after a
+        crash: documents already copied are refreshed and then removed from the hot tier.
+        A ticket is only deleted if it is still archivable and unchanged (same version)
+        since it was copied; the archive copies of tickets that changed are dropped again.
+        Returns the number of tickets archived.
+        """
+        batch_size = batch_size or settings.archive_batch_size
+        now = datetime.utcnow()
+        query = self._archivable_query(now)
+        archived = 0
+
+        while True:
+            batch = await self.db.tickets.find(query).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+
+            for doc in batch:
+                doc["archived_at"] = now
+            try:
+                await self.db.tickets_archive.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != 11000 for err in write_errors):
+                    raise
+                # Duplicate keys mean an earlier run copied the doc but did not delete it;
+                # the hot doc may have changed since, so overwrite that copy
+                for err in write_errors:
+                    doc = batch[err["index"]]
+                    await self.db.tickets_archive.replace_one({"_id": doc["_id"]}, doc)
+
+            # Only delete what was copied: a ticket reopened or edited meanwhile stays hot
+            result = await self.db.tickets.delete_many({"$and": [
+                query,
+                {"$or": [{"_id": doc["_id"], "version": doc.get("version")} for doc in batch]},
+            ]})
+            archived += result.deleted_count
+            if result.deleted_count:
+                await record_ticket_change(self.db)
+            logger.info(f"🗄️ Archived batch of {result.deleted_count} ticket(s).")
+
+            if result.deleted_count < len(batch):
+                ids = [doc["_id"] for doc in batch]
+                still_hot = [doc["_id"] async for doc in self.db.tickets.find({"_id": {"$in": ids}}, {"_id": 1})]
+                if still_hot:
+                    await self.db.tickets_archive.delete_many({"_id": {"$in": still_hot}})
+                    logger.info(f"🗄️ Kept {len(still_hot)} ticket(s) that changed while being archived.")
+
+            if len(batch) < batch_size:
+                break
+
+        return archived
+
+
+class ArchiveScheduler:
+    """Runs ArchiveService periodically inside the API process."""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def start(self, db):
+        if settings.archive_enabled:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, db):
+        service = ArchiveService(db)
+        while True:
+            try:
+                count = await service.archive_tickets()
+                if count:
+                    logger.info(f"🗄️ Archive run moved {count} ticket(s).")
+            except Exception as e:
+                logger.error(f"❌ Archive run failed: {e}")
+            await asyncio.sleep(settings.archive_interval_seconds)
+
+
+archive_scheduler = ArchiveScheduler()
@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+
+from app.config import settings
+from app.models.ticket import TicketStatus
+from app.models.user import UserInDB, UserRole, user_adapter
+from app.utils.tracing import tracer, traced
+
+# Tickets that count towards a moderator's load
+OPEN_STATUSES = [TicketStatus.OPEN, TicketStatus.IN_PROGRESS]
+
+
+def skill_match_matrix(ticket_skills: list[list[str]], moderator_skills: list[list[str]]) -> np.ndarray:
+    """
+    (tickets x moderators) count of each ticket's required skills that a moderator covers.
+    A required skill is covered when it is a case-insensitive substring of one of the
+    moderator's skills. Strings are only compared once per distinct (required, skill) pair;
+    the rest is matrix products.
+    """
+    required = sorted({skill.lower() for skills in ticket_skills for skill in skills})
+    offered = sorted({skill.lower() for skills in moderator_skills for skill in skills})
+    if not required or not offered:
+        return np.zeros((len(ticket_skills), len(moderator_skills)), dtype=np.int32)
+
+    required_index = {skill: i for i, skill in enumerate(required)}
+    offered_index = {skill: i for i, skill in enumerate(offered)}
+
+    # required x offered: substring match
+    covers_skill = np.array([[req in off for off in offered] for req in required], dtype=np.int32)
+
+    ticket_incidence = np.zeros((len(ticket_skills), len(required)), dtype=np.int32)
+    for t, skills in enumerate(ticket_skills):
+        for skill in {s.lower() for s in skills}:
+            ticket_incidence[t, required_index[skill]] = 1
+
+    moderator_incidence = np.zeros((len(moderator_skills), len(offered)), dtype=np.int32)
+    for m, skills in enumerate(moderator_skills):
+        for skill in skills:
+            moderator_incidence[m, offered_index[skill.lower()]] = 1
+
+    # required x moderators: does any of the moderator's skills cover it
+    covers_moderator = (covers_skill @ moderator_incidence.T) > 0
+    return ticket_incidence @ covers_moderator.astype(np.int32)
+
+
+def assign_batch(
+    match: np.ndarray,
+    load: np.ndarray,
+    capacity: int,
+    load_weight: float,
+    ranks: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Jointly assign tickets to moderators. Returns the moderator index per ticket, -1 if none.
+
+    Only moderators with at least one matching skill and spare capacity are eligible.
+    Each round every unassigned ticket bids for its best moderator by
+    match - load_weight * load / capacity; each moderator accepts the best bids
+    (most matched skills, then highest priority rank) up to a fair share of the
+    remaining tickets and its spare capacity. Loads are updated between rounds,
+    so a backlog spreads across the moderators that can handle it.
+    """
+    n_tickets, n_moderators = match.shape
+    assigned = np.full(n_tickets, -1, dtype=np.int64)
+    if n_tickets == 0 or n_moderators == 0:
+        return assigned
+
+    load = load.astype(np.float64).copy()
+    ranks = np.zeros(n_tickets) if ranks is None else np.asarray(ranks, dtype=np.float64)
+    unassigned = np.arange(n_tickets)
+
+    while unassigned.size:
+        spare = capacity - load
+        eligible = (match[unassigned] > 0) & (spare > 0)
+        has_choice = eligible.any(axis=1)
+        unassigned = unassigned[has_choice]
+        if not unassigned.size:
+            break
+        eligible = eligible[has_choice]
+
+        utility = np.where(eligible, match[unassigned] - load_weight * load / capacity, -np.inf)
+        choice = utility.argmax(axis=1)
+
+        quota = max(1, math.ceil(unassigned.size / np.count_nonzero(spare > 0)))
+        limit = np.minimum(spare, quota)
+
+        # Group bids by moderator, best bids first, and keep the first `limit` of each group
+        order = np.lexsort((-ranks[unassigned], -match[unassigned, choice], choice))
+        sorted_choice = choice[order]
+        group_start = np.searchsorted(sorted_choice, sorted_choice, side="left")
+        position = np.arange(order.size) - group_start
+        accepted = order[position < limit[sorted_choice]]
+
+        winners = unassigned[accepted]
+        assigned[winners] = choice[accepted]
+        np.add.at(load, choice[accepted], 1)
+        unassigned = np.setdiff1d(unassigned, winners, assume_unique=True)
+
+    return assigned
+
+
+@traced("ticket.assign")
+async def assign_moderators(db, ticket_skills: list[list[str]], ranks: list[int] | None = None) -> list[UserInDB | None]:
+    """
+    Pick a moderator for every ticket in one go: one query for active moderators,
+    one aggregation for their open-ticket load, then assign_batch. Tickets no
+    moderator has a skill for fall back to an admin, like find_matching_moderator
+    always did. Tickets whose matching moderators are all at capacity get None:
+    they stay unassigned in the queue for claim_next_ticket.
+    """
+    tracer.set_attributes(tickets=len(ticket_skills))
+    moderator_docs = await db.users.find(
+        {"role": UserRole.MODERATOR, "is_active": True, "skills.0": {"$exists": True}}
+    ).to_list(length=None)
+
+    assigned = np.full(len(ticket_skills), -1)
+    at_capacity = np.zeros(len(ticket_skills), dtype=bool)
+    if moderator_docs:
+        moderator_ids = [str(doc["_id"]) for doc in moderator_docs]
+        load_by_id = {
+            row["_id"]: row["count"]
+            async for row in db.tickets.aggregate([
+                {"$match": {"assigned_to": {"$in": moderator_ids}, "status": {"$in": OPEN_STATUSES}}},
+                {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}}},
+            ])
+        }
+        match = skill_match_matrix(ticket_skills, [doc["skills"] for doc in moderator_docs])
+        load = np.array([load_by_id.get(moderator_id, 0) for moderator_id in moderator_ids])
+        assigned = assign_batch(
+            match,
+            load,
+            settings.assignment_max_open_per_moderator,
+            settings.assignment_load_weight,
+            np.asarray(ranks) if ranks is not None else None,
+        )
+        at_capacity = (assigned < 0) & (match > 0).any(axis=1)
+
+    admin = None
+    if ((assigned < 0) & ~at_capacity).any():
+        admin_doc = await db.users.find_one({"role": UserRole.ADMIN})
+        admin = user_adapter.from_db(admin_doc) if admin_doc else None
+
+    moderators = user_adapter.many_from_db(moderator_docs)
+    return [
+        moderators[index] if index >= 0 else None if queued else admin
+        for index, queued in zip(assigned, at_capacity)
+    ]
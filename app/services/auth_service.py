@@ -1,9 +1,20 @@
 from app.models.database import get_database
-from app.models.user import UserInDB, UserRole
+from app.models.user import UserInDB, UserRole, user_adapter
 from app.utils.security import get_password_hash, verify_password
-from typing import Optional, List
+from app.utils.single_flight import SingleFlight
+from app.config import settings
+from typing import Optional, List, Tuple
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
+import re
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
+
+# Every authenticated request looks its user up; identical concurrent lookups share one query
+user_reads = SingleFlight("user_lookup", ttl=settings.single_flight_user_ttl_seconds)
 
 class AuthService:
     async def create_user(self, email: str, username: str, password: str, full_name: str = None) -> UserInDB:
@@ -24,7 +35,8 @@ class AuthService:
         
         result = await db.users.insert_one(user_data)
         user_data["_id"] = result.inserted_id
-        return UserInDB(**user_data)
+        user_reads.invalidate(("email", email))
+        return user_adapter.from_db(user_data)
     
     async def authenticate_user(self, email: str, password: str) -> Optional[UserInDB]:
         """Authenticate user by email and password"""
@@ -33,7 +45,7 @@ class AuthService:
         if not user_doc:
             return None
         
-        user = UserInDB(**user_doc)
+        user = user_adapter.from_db(user_doc)
         if not verify_password(password, user.hashed_password):
             return None
         
@@ -41,10 +53,13 @@ class AuthService:
     
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
         """Get user by email"""
+        return await user_reads.do(("email", email), lambda: self._load_user_by_email(email))
+
+    async def _load_user_by_email(self, email: str) -> Optional[UserInDB]:
         db = get_database()
         user_doc = await db.users.find_one({"email": email})
         if user_doc:
-            return UserInDB(**user_doc)
+            return user_adapter.from_db(user_doc)
         return None
 
     async def get_user_by_username(self, username: str) -> Optional[UserInDB]:
@@ -52,20 +67,49 @@ class AuthService:
         db = get_database()
         user_doc = await db.users.find_one({"username": username})
         if user_doc:
-            return UserInDB(**user_doc)
+            return user_adapter.from_db(user_doc)
         return None
     
     async def get_user_by_id(self, user_id: str) -> Optional[UserInDB]:
         """Get user by ID"""
+        return await user_reads.do(("id", user_id), lambda: self._load_user_by_id(user_id))
+
+    async def _load_user_by_id(self, user_id: str) -> Optional[UserInDB]:
         db = get_database()
         try:
             user_doc = await db.users.find_one({"_id": ObjectId(user_id)})
             if user_doc:
-                return UserInDB(**user_doc)
+                return user_adapter.from_db(user_doc)
         except Exception:
             pass
         return None
     
+    async def issue_stream_token(self, user_id: str) -> str:
+        """
+        Short-lived, single-use token for opening the ticket event stream, which
+        browsers (EventSource) can only authenticate through the URL. Only its hash is stored.
+        """
+        db = get_database()
+        token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        await db.stream_tokens.insert_one({
+            "_id": hashlib.sha256(token.encode()).hexdigest(),
+            "user_id": user_id,
+            "expires_at": now + timedelta(seconds=settings.stream_token_ttl_seconds),
+        })
+        return token
+
+    async def redeem_stream_token(self, token: str) -> Optional[UserInDB]:
+        """Consume a stream token; None if it is unknown, used or expired."""
+        db = get_database()
+        doc = await db.stream_tokens.find_one_and_delete({
+            "_id": hashlib.sha256(token.encode()).hexdigest(),
+            "expires_at": {"$gt": datetime.utcnow()},
+        })
+        if not doc:
+            return None
+        return await self.get_user_by_id(doc["user_id"])
+
     async def update_user_role_and_skills(self, user_id: str, role: UserRole, skills: List[str] = None) -> Optional[UserInDB]:
         """Update user role and skills (admin only)"""
         db = get_database()
@@ -83,19 +127,49 @@ class AuthService:
             )
             
             if result.modified_count:
-                return await self.get_user_by_id(user_id)
+                user = await self._load_user_by_id(user_id)
+                user_reads.invalidate(("id", user_id))
+                if user:
+                    user_reads.invalidate(("email", user.email))
+                return user
         except Exception as e:
-            print(f"Error updating user: {e}")
+            logger.error(f"❌ Error updating user: {e}")
         
         return None
     
-    async def get_all_users(self) -> List[UserInDB]:
-        """Get all users (admin only)"""
+    async def list_users(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        role: Optional[UserRole] = None,
+        is_active: Optional[bool] = None,
+        skill: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[UserInDB], Optional[str]]:
+        """
+        One page of users in _id order (admin only). `cursor` is the id of the last
+        user on the previous page. Filters run in Mongo; `search` is a case-sensitive
+        username/email prefix, so it can use the unique indexes on both fields.
+        Returns (users, next_cursor); next_cursor is None on the last page.
+        """
         db = get_database()
-        users = []
-        async for user_doc in db.users.find():
-            users.append(UserInDB(**user_doc))
-        return users
+        query = {}
+        if role is not None:
+            query["role"] = role
+        if is_active is not None:
+            query["is_active"] = is_active
+        if skill:
+            query["skills"] = skill
+        if search:
+            prefix = {"$regex": f"^{re.escape(search)}"}
+            query["$or"] = [{"username": prefix}, {"email": prefix}]
+        if cursor:
+            query["_id"] = {"$gt": ObjectId(cursor)}
+
+        # Fetch one extra document to know whether there is a next page
+        docs = await db.users.find(query).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+        return user_adapter.many_from_db(docs[:limit]), next_cursor
 
 # Export a singleton instance
 auth_service = AuthService()
@@ -2,8 +2,12 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import settings
+from app.utils.tracing import tracer, traced
 from jinja2 import Template
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 class EmailService:
     def __init__(self):
@@ -11,12 +15,14 @@ class EmailService:
         self.smtp_port = settings.smtp_port
         self.smtp_user = settings.smtp_user
         self.smtp_password = settings.smtp_password
+        self.smtp_use_tls = settings.smtp_use_tls
         self.from_email = settings.from_email
     
+    @traced("email.send_assignment")
     async def send_ticket_assignment_email(self, moderator_email: str, ticket_data: dict):
         """Send email notification to assigned moderator"""
         if not all([self.smtp_user, self.smtp_password, moderator_email]):
-            print("Email configuration incomplete, skipping email notification")
+            logger.warning("⚠️ Email configuration incomplete, skipping email notification")
             return
             
         template = Template("""
@@ -56,20 +62,61 @@ class EmailService:
         
         try:
             # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._send_email_sync,
-                msg
-            )
-            print(f"Email sent to {moderator_email}")
+            loop = asyncio.get_running_loop()
+            with tracer.span("smtp.send"):
+                await loop.run_in_executor(
+                    None,
+                    self._send_email_sync,
+                    msg
+                )
+            logger.info(f"📨 Email sent to {moderator_email}")
         except Exception as e:
-            print(f"Email sending error: {e}")
+            logger.error(f"❌ Email sending error: {e}")
     
+    async def send_sla_breach_email(self, recipient_email: str, tickets: list):
+        """Send one SLA breach notification covering a batch of escalated tickets"""
+        if not all([self.smtp_user, self.smtp_password, recipient_email]):
+            logger.warning("⚠️ Email configuration incomplete, skipping email notification")
+            return
+
+        template = Template("""
+        <html>
+        <body>
+            <h2>SLA Breach: {{ tickets|length }} ticket(s) escalated</h2>
+            <p>The following tickets missed their SLA deadline and were escalated:</p>
+
+            {% for ticket in tickets %}
+            <div style="border: 1px solid #ddd; padding: 15px; margin: 10px 0;">
+                <h3>{{ ticket.title }}</h3>
+                <p><strong>Missed:</strong> {{ ticket.stage }}</p>
+                <p><strong>Priority (after escalation):</strong> {{ ticket.priority }}</p>
+                <p><strong>Escalation level:</strong> {{ ticket.escalation_level }}</p>
+            </div>
+            {% endfor %}
+
+            <p>Please log in to the system to act on these tickets.</p>
+        </body>
+        </html>
+        """)
+
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"SLA breach: {len(tickets)} ticket(s) escalated"
+        msg['From'] = self.from_email
+        msg['To'] = recipient_email
+        msg.attach(MIMEText(template.render(tickets=tickets), 'html'))
+
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._send_email_sync, msg)
+            logger.info(f"📨 SLA breach email sent to {recipient_email}")
+        except Exception as e:
+            logger.error(f"❌ Email sending error: {e}")
+
     def _send_email_sync(self, msg):
         """Synchronous email sending function"""
         with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            server.starttls()
+            if self.smtp_use_tls:
+                server.starttls()
             server.login(self.smtp_user, self.smtp_password)
             server.send_message(msg)
 
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from app.models.user import UserRole
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to clients
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+TICKET_ASSIGNED = "ticket.assigned"
+RESYNC = "resync"
+
+# meta document counting ticket writes; the ticket list ETag is built from it
+TICKET_CHANGES_ID = "ticket_changes"
+
+
+def ticket_event(event_type: str, doc: dict, previous: dict | None = None) -> dict:
+    """Build the (slim) event payload from a ticket document (and the document before the write, if known)."""
+    updated_at = doc.get("updated_at") or doc.get("created_at")
+    event = {
+        "type": event_type,
+        "ticket_id": str(doc["_id"]),
+        "status": doc.get("status"),
+        "priority": doc.get("priority"),
+        "created_by": doc.get("created_by"),
+        "assigned_to": doc.get("assigned_to"),
+        "version": doc.get("version", 0),
+        "updated_at": updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at,
+    }
+    if previous is not None:
+        event["previous_assigned_to"] = previous.get("assigned_to")
+    return event
+
+
+async def record_ticket_change(db):
+    """
+    Bump the ticket change counter. Called after every ticket write a list can show,
+    so the counter grows in commit order (updated_at is stamped before the write).
+    """
+    try:
+        await db.meta.update_one({"_id": TICKET_CHANGES_ID}, {"$inc": {"seq": 1}}, upsert=True)
+    except Exception as e:
+        logger.error(f"❌ Failed to record ticket change: {e}")
+
+
+async def ticket_changes(db) -> int:
+    """Current value of the ticket change counter."""
+    doc = await db.meta.find_one({"_id": TICKET_CHANGES_ID})
+    return doc.get("seq", 0) if doc else 0
+
+
+def is_visible(event: dict, user_id: str, user_role: str) -> bool:
+    """Same visibility rules as TicketService.get_user_tickets."""
+    if user_role == UserRole.ADMIN:
+        return True
+    if user_role == UserRole.MODERATOR:
+        if event.get("assigned_to") in (user_id, None):
+            return True
+        # Assignment events also reach moderators who saw the ticket before (unassigned
+        # pool or previous assignee) so they can drop it; without the previous assignee
+        # (change stream events) that is every moderator
+        return event["type"] == TICKET_ASSIGNED and event.get("previous_assigned_to") in (user_id, None)
+    return event.get("created_by") == user_id
+
+
+class Subscriber:
+    def __init__(self, user_id: str, user_role: str, max_queue: int = 100):
+        self.user_id = user_id
+        self.user_role = user_role
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def offer(self, event: dict):
+        if not is_visible(event, self.user_id, self.user_role):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop the backlog and tell it to refetch instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC})
+
+
+class TicketEventBroker:
+    """
+    Per-process fan-out of ticket events to connected clients.
+
+    The upstream source is a single MongoDB change stream per worker when the
+    deployment supports it (replica set / Atlas). Otherwise TicketService
+    publishes its own writes in-process, which only reaches clients on the
+    same worker.
+    """
+
+    def __init__(self):
+        self.subscribers: set[Subscriber] = set()
+        self.source = "in_process"
+        self._watch_task: asyncio.Task | None = None
+
+    def subscribe(self, user_id: str, user_role: str) -> Subscriber:
+        subscriber = Subscriber(user_id, user_role)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def dispatch(self, event: dict):
+        for subscriber in list(self.subscribers):
+            subscriber.offer(event)
+
+    def publish_local(self, event: dict):
+        """Called by the service layer after a write; ignored when the change stream is the source."""
+        if self.source == "in_process":
+            self.dispatch(event)
+
+    async def start(self, db):
+        self._watch_task = asyncio.create_task(self._watch(db.tickets))
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+        self.source = "in_process"
+
+    async def _watch(self, collection):
+        try:
+            async with collection.watch(full_document="updateLookup") as stream:
+                self.source = "change_stream"
+                logger.info("📡 Ticket events fed by MongoDB change stream.")
+                async for change in stream:
+                    event = self._event_from_change(change)
+                    if event:
+                        self.dispatch(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Change streams unavailable ({e}); using in-process ticket events.")
+        self.source = "in_process"
+
+    @staticmethod
+    def _event_from_change(change: dict) -> dict | None:
+        doc = change.get("fullDocument")
+        if not doc:
+            return None
+        if change["operationType"] == "insert":
+            return ticket_event(TICKET_CREATED, doc)
+        updated_fields = change.get("updateDescription", {}).get("updatedFields", {})
+        if updated_fields.get("assigned_to"):
+            return ticket_event(TICKET_ASSIGNED, doc)
+        return ticket_event(TICKET_UPDATED, doc)
+
+
+ticket_events = TicketEventBroker()
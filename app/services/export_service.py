@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Exported columns per dataset (hashed_password is never exported)
+TICKET_COLUMNS = [
+    ("_id", "string"), ("title", "string"), ("description", "string"), ("status", "string"),
+    ("priority", "string"), ("priority_rank", "int"), ("ticket_type", "string"),
+    ("required_skills", "list"), ("ai_notes", "string"), ("ai_version", "string"),
+    ("created_by", "string"), ("assigned_to", "string"), ("created_at", "timestamp"),
+    ("updated_at", "timestamp"), ("first_response_at", "timestamp"), ("sla_due_at", "timestamp"),
+    ("escalation_level", "int"), ("version", "int"), ("archived_at", "timestamp"),
+]
+USER_COLUMNS = [
+    ("_id", "string"), ("email", "string"), ("username", "string"), ("full_name", "string"),
+    ("role", "string"), ("skills", "list"), ("is_active", "bool"),
+    ("created_at", "timestamp"), ("updated_at", "timestamp"),
+]
+
+# dataset -> (source collections, columns)
+DATASETS = {
+    "tickets": (["tickets", "tickets_archive"], TICKET_COLUMNS),
+    "users": (["users"], USER_COLUMNS),
+}
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ms"),
+        "list": pa.list_(pa.string()),
+    }
+    return pa.schema(
+        [(name, types[kind]) for name, kind in columns]
+        + [("changed_at", pa.timestamp("ms")), ("exported_at", pa.timestamp("ms"))]
+    )
+
+
+def _cell(value, kind):
+    if value is None:
+        return None
+    if kind == "string":
+        return getattr(value, "value", None) or str(value)
+    if kind == "list":
+        return [str(item) for item in value]
+    return value
+
+
+def changed_at(doc: dict) -> datetime:
+    """When a document last changed: updated_at, or created_at if it was never updated."""
+    return doc.get("updated_at") or doc.get("created_at") or EPOCH
+
+
+class ExportService:
+    """
+    Incremental, date-partitioned columnar snapshot of tickets and users for
+    offline analytics:
+
+        <export_dir>/<dataset>/date=YYYY-MM-DD/part-<run>-<n>.parquet
+
+    Only documents changed since the dataset's watermark (kept in meta.export:<dataset>)
+    are read, from a Motor cursor in batches of export_batch_size, so memory stays
+    bounded. Each batch is written as one file per change date. The watermark only
+    advances once every file of the run is written, so a failed run is simply
+    repeated. Rows carry changed_at: readers keep the latest row per _id.
+    """
+
+    def __init__(self, db, export_dir: str | None = None, file_format: str | None = None):
+        self.db = db
+        self.export_dir = export_dir or settings.export_dir
+        self.file_format = file_format or settings.export_format
+
+    async def export_all(self, full: bool = False) -> dict:
+        return {dataset: await self.export_dataset(dataset, full) for dataset in DATASETS}
+
+    async def export_dataset(self, dataset: str, full: bool = False) -> dict:
+        collections, columns = DATASETS[dataset]
+        schema = _arrow_schema(columns)
+        state_id = f"export:{dataset}"
+
+        state = await self.db.meta.find_one({"_id": state_id})
+        since = EPOCH if full or not state else state["watermark"]
+        # Stop a little in the past so writes still in flight land in the next run
+        until = datetime.utcnow() - timedelta(seconds=settings.export_safety_lag_seconds)
+        query = {"$or": [
+            {"updated_at": {"$gt": since, "$lte": until}},
+            {"updated_at": None, "created_at": {"$gt": since, "$lte": until}},
+        ]}
+        projection = {name: 1 for name, _ in columns}
+
+        run_id = f"{until:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        exported_at = datetime.utcnow()
+        rows, files = 0, []
+        for collection in collections:
+            cursor = self.db[collection].find(query, projection).batch_size(settings.export_batch_size)
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= settings.export_batch_size:
+                    files += await self._write_batch(dataset, batch, columns, schema, run_id, len(files), exported_at)
+                    rows += len(batch)
+                    batch = []
+            if batch:
+                files += await self._write_batch(dataset, batch, columns, schema, run_id, len(files), exported_at)
+                rows += len(batch)
+
+        await self.db.meta.update_one(
+            {"_id": state_id},
+            {"$set": {"watermark": until, "last_run": run_id, "last_rows": rows, "last_files": len(files)}},
+            upsert=True
+        )
+        logger.info(f"📦 Exported {rows} {dataset} row(s) changed since {since:%Y-%m-%d %H:%M:%S} into {len(files)} file(s).")
+        return {"since": since, "until": until, "rows": rows, "files": files}
+
+    async def _write_batch(self, dataset, docs, columns, schema, run_id, file_index, exported_at) -> list[str]:
+        by_date: dict[str, list[dict]] = {}
+        for doc in docs:
+            by_date.setdefault(f"{changed_at(doc):%Y-%m-%d}", []).append(doc)
+
+        tables = []
+        for date, date_docs in by_date.items():
+            data = {name: [_cell(doc.get(name), kind) for doc in date_docs] for name, kind in columns}
+            data["changed_at"] = [changed_at(doc) for doc in date_docs]
+            data["exported_at"] = [exported_at] * len(date_docs)
+            extension = "arrow" if self.file_format == "arrow" else "parquet"
+            path = os.path.join(
+                self.export_dir, dataset, f"date={date}", f"part-{run_id}-{file_index + len(tables):05d}.{extension}"
+            )
+            tables.append((path, data))
+
+        # pyarrow conversion and file I/O are blocking; keep them off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_tables, tables, schema)
+        return [path for path, _ in tables]
+
+    def _write_tables(self, tables, schema):
+        import pyarrow as pa
+
+        for path, data in tables:
+            table = pa.Table.from_pydict(data, schema=schema)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            if self.file_format == "arrow":
+                with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_table(table)
+            else:
+                import pyarrow.parquet as pq
+
+                pq.write_table(table, tmp_path, compression="zstd")
+            os.replace(tmp_path, path)
+
+
+class ExportJob:
+    """
+    The admin-triggered export as a background job in this process: at most one
+    run at a time. Stopping it (shutdown) discards the run in flight; its
+    watermarks have not moved, so the next run exports the same documents again.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.started_at: datetime | None = None
+        self.full = False
+        self.last_result: dict | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, db, full: bool = False) -> bool:
+        """Start a run unless one is already going. Returns True if this call started it."""
+        if self.running:
+            return False
+        self.started_at = datetime.utcnow()
+        self.full = full
+        # Not a background_tasks task: that would hold the triggering request's trace open for the whole run
+        self._task = asyncio.create_task(self._run(db, full))
+        return True
+
+    async def _run(self, db, full: bool):
+        try:
+            results = await ExportService(db).export_all(full=full)
+            self.last_result = {"finished_at": datetime.utcnow(), "datasets": {
+                dataset: {"rows": result["rows"], "files": len(result["files"]), "until": result["until"]}
+                for dataset, result in results.items()
+            }}
+        except Exception as e:
+            logger.error(f"❌ Export failed: {e}")
+            self.last_result = {"finished_at": datetime.utcnow(), "error": str(e)}
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def get_status(self, db) -> dict:
+        states = {
+            doc["_id"].split(":", 1)[1]: doc
+            async for doc in db.meta.find({"_id": {"$in": [f"export:{dataset}" for dataset in DATASETS]}})
+        }
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "full": self.full,
+            "datasets": {
+                dataset: {
+                    "watermark": state.get("watermark"),
+                    "last_run": state.get("last_run"),
+                    "last_rows": state.get("last_rows"),
+                    "last_files": state.get("last_files"),
+                }
+                for dataset, state in states.items()
+            },
+            "last_result": self.last_result,
+        }
+
+
+export_job = ExportJob()
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.utils.single_flight import SingleFlight
+
+PENDING = "pending"
+COMPLETED = "completed"
+
+# Failure reasons
+KEY_REUSED = "key_reused"
+IN_PROGRESS = "in_progress"
+
+# Duplicates arriving at the same process share the first call without touching the database
+idempotent_calls = SingleFlight("idempotent_writes")
+
+
+class IdempotencyError(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def request_fingerprint(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Runs a write at most once per Idempotency-Key and replays its stored response.
+
+    The first request claims the key by inserting a `pending` record into
+    `idempotency_keys` (unique _id), runs the write and stores the response;
+    records expire through a TTL index on expires_at. Duplicates wait for the
+    pending record to complete (up to idempotency_wait_seconds, then IN_PROGRESS).
+    A pending record whose lock ran out (its process died) is taken over; a
+    failed write releases the key so the client can retry. Reusing a key with
+    a different request body is KEY_REUSED.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        record_id = f"{scope}:{key}"
+        return await idempotent_calls.do(
+            (record_id, fingerprint), lambda: self._run(record_id, fingerprint, fn)
+        )
+
+    async def _run(self, record_id: str, fingerprint: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        collection = self.db.idempotency_keys
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        delay = 0.05
+
+        while True:
+            now = datetime.utcnow()
+            try:
+                await collection.insert_one({
+                    "_id": record_id,
+                    "fingerprint": fingerprint,
+                    "status": PENDING,
+                    "created_at": now,
+                    "locked_until": now + timedelta(seconds=settings.idempotency_lock_seconds),
+                    "expires_at": now + timedelta(seconds=settings.idempotency_ttl_seconds),
+                })
+            except DuplicateKeyError:
+                pass
+            else:
+                return await self._execute(record_id, fn)
+
+            record = await collection.find_one({"_id": record_id})
+            if record is None:
+                continue  # released or expired since the insert
+            if record["expires_at"] <= now:
+                # Not reaped by the TTL monitor yet
+                await collection.delete_one({"_id": record_id, "expires_at": record["expires_at"]})
+                continue
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyError(KEY_REUSED)
+            if record["status"] == COMPLETED:
+                return record["response"]
+
+            if record["locked_until"] <= now:
+                taken = await collection.update_one(
+                    {"_id": record_id, "status": PENDING, "locked_until": record["locked_until"]},
+                    {"$set": {"locked_until": now + timedelta(seconds=settings.idempotency_lock_seconds)}},
+                )
+                if taken.modified_count:
+                    return await self._execute(record_id, fn)
+                continue
+
+            if time.monotonic() >= deadline:
+                raise IdempotencyError(IN_PROGRESS)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    async def _execute(self, record_id: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        try:
+            response = await fn()
+        except BaseException:
+            await self.db.idempotency_keys.delete_one({"_id": record_id, "status": PENDING})
+            raise
+        await self.db.idempotency_keys.update_one(
+            {"_id": record_id},
+            {"$set": {"status": COMPLETED, "response": response, "completed_at": datetime.utcnow()}},
+        )
+        return response
@@ -0,0 +1,254 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.models.ticket import TicketStatus, TicketPriority, priority_rank
+from app.models.user import UserRole
+from app.services.email_service import email_service
+from app.services.event_service import ticket_events, ticket_event, record_ticket_change, TICKET_UPDATED
+
+logger = logging.getLogger(__name__)
+
+FIRST_RESPONSE = "first_response"
+RESOLUTION = "resolution"
+
+# One priority step up per escalation
+_ESCALATED_PRIORITY = {
+    TicketPriority.LOW.value: TicketPriority.MEDIUM.value,
+    TicketPriority.MEDIUM.value: TicketPriority.HIGH.value,
+    TicketPriority.HIGH.value: TicketPriority.URGENT.value,
+    TicketPriority.URGENT.value: TicketPriority.URGENT.value,
+}
+
+
+def _value(enum_or_str) -> str:
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+def sla_fields(priority, created_at: datetime, status, responded: bool = False) -> dict:
+    """
+    SLA deadlines for a ticket of this priority, plus `sla_due_at`: the next pending
+    deadline (first response until a moderator moves the ticket off open, then
+    resolution; none once resolved or closed).
+    """
+    priority = _value(priority)
+    first_response_due = created_at + timedelta(minutes=settings.sla_first_response_minutes[priority])
+    resolution_due = created_at + timedelta(minutes=settings.sla_resolution_minutes[priority])
+    return {
+        "sla_first_response_due_at": first_response_due,
+        "sla_resolution_due_at": resolution_due,
+        "sla_due_at": next_due_at(status, responded, first_response_due, resolution_due),
+    }
+
+
+def next_due_at(status, responded: bool, first_response_due, resolution_due):
+    status = _value(status)
+    if status in (TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value):
+        return None
+    if status == TicketStatus.OPEN.value and not responded:
+        return first_response_due
+    return resolution_due
+
+
+def status_update_pipeline(status, now: datetime) -> list[dict]:
+    """
+    Update pipeline for a status change: same fields as a plain $set/$inc, plus
+    first_response_at and the next SLA deadline (see next_due_at), computed from the
+    stored deadlines so the change stays a single write.
+    """
+    status = _value(status)
+    if status == TicketStatus.OPEN.value:
+        first_response_at = "$first_response_at"
+        sla_due_at = {"$cond": [
+            {"$ifNull": ["$first_response_at", False]}, "$sla_resolution_due_at", "$sla_first_response_due_at"
+        ]}
+    else:
+        first_response_at = {"$ifNull": ["$first_response_at", now]}
+        sla_due_at = None if status in (TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value) \
+            else "$sla_resolution_due_at"
+    return [{"$set": {
+        "status": status,
+        "updated_at": now,
+        "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+        "first_response_at": first_response_at,
+        "sla_due_at": sla_due_at,
+    }}]
+
+
+class SLAScheduler:
+    """
+    Min-heap of upcoming SLA deadlines (sla_due_at, ticket id), loaded from the
+    indexed sla_due_at field and fed by track() on every write that sets it.
+    The loop sleeps until the earliest deadline (or until track() adds an earlier
+    one), then escalates everything due in batches.
+
+    Entries are never removed: when one comes due, the ticket is re-read and only
+    escalated if its stored sla_due_at really passed, so resolved or rescheduled
+    tickets drop out then. The heap is reloaded every sla_resync_seconds to pick
+    up deadlines written by other processes; the escalation itself is a
+    conditional update, so two processes never escalate the same breach twice.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, str]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.escalated = {FIRST_RESPONSE: 0, RESOLUTION: 0}
+        self.skipped = 0
+
+    async def start(self, db):
+        if settings.sla_enabled:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def track(self, ticket_id, due_at: datetime | None):
+        """Register a ticket's next deadline (call after any write that sets sla_due_at)."""
+        if due_at is None or not settings.sla_enabled:
+            return
+        if not self._heap or due_at < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (due_at, str(ticket_id)))
+
+    async def _reload(self, db):
+        horizon = datetime.utcnow() + timedelta(seconds=2 * settings.sla_resync_seconds)
+        self._heap = [
+            (doc["sla_due_at"], str(doc["_id"]))
+            async for doc in db.tickets.find({"sla_due_at": {"$lte": horizon}}, {"sla_due_at": 1})
+        ]
+        heapq.heapify(self._heap)
+
+    async def _run(self, db):
+        loop = asyncio.get_running_loop()
+        next_resync = 0.0
+        while True:
+            try:
+                if loop.time() >= next_resync:
+                    await self._reload(db)
+                    next_resync = loop.time() + settings.sla_resync_seconds
+
+                now = datetime.utcnow()
+                if self._heap and self._heap[0][0] <= now:
+                    await self.escalate_due(db, now)
+                    continue
+
+                timeout = next_resync - loop.time()
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ SLA escalation failed: {e}")
+                await asyncio.sleep(5)
+
+    async def escalate_due(self, db, now: datetime) -> int:
+        """Escalate up to sla_escalation_batch_size due tickets. Returns how many were escalated."""
+        ids = set()
+        while self._heap and self._heap[0][0] <= now and len(ids) < settings.sla_escalation_batch_size:
+            ids.add(heapq.heappop(self._heap)[1])
+
+        due_docs = await db.tickets.find(
+            {"_id": {"$in": [ObjectId(i) for i in ids]}, "sla_due_at": {"$lte": now}}
+        ).to_list(length=None)
+        self.skipped += len(ids) - len(due_docs)
+        if not due_docs:
+            return 0
+
+        claimed = await asyncio.gather(*(self._escalate(db, doc, now) for doc in due_docs))
+        escalated = [doc for doc in claimed if doc is not None]
+        if escalated:
+            await self._notify(db, escalated)
+            logger.warning(f"⏰ Escalated {len(escalated)} ticket(s) for SLA breach.")
+        return len(escalated)
+
+    async def _escalate(self, db, doc: dict, now: datetime) -> dict | None:
+        stage = RESOLUTION if doc.get("first_response_at") or doc.get("status") != TicketStatus.OPEN.value \
+            else FIRST_RESPONSE
+        priority = _ESCALATED_PRIORITY.get(doc.get("priority"), TicketPriority.HIGH.value)
+        # After a missed first response, the resolution deadline is still ahead (or also missed)
+        next_due = doc.get("sla_resolution_due_at") if stage == FIRST_RESPONSE else None
+        if next_due is not None and next_due <= now:
+            next_due = now
+
+        updated = await db.tickets.find_one_and_update(
+            # Conditional on the deadline we read, so a concurrent change or escalation wins
+            {"_id": doc["_id"], "sla_due_at": doc["sla_due_at"]},
+            {
+                "$set": {
+                    "priority": priority,
+                    "priority_rank": priority_rank(priority),
+                    "sla_due_at": next_due,
+                    "escalated_at": now,
+                    "updated_at": now,
+                },
+                "$addToSet": {"sla_breaches": stage},
+                "$inc": {"escalation_level": 1, "version": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated is None:
+            return None
+        self.escalated[stage] += 1
+        await record_ticket_change(db)
+        ticket_events.publish_local(ticket_event(TICKET_UPDATED, updated))
+        self.track(updated["_id"], next_due)
+        return {**updated, "breached_stage": stage}
+
+    async def _notify(self, db, tickets: list[dict]):
+        """One email per recipient per batch: the assigned moderators and every active admin."""
+        admins = await db.users.find(
+            {"role": UserRole.ADMIN, "is_active": True}, {"email": 1}
+        ).to_list(length=None)
+        assignee_ids = {t["assigned_to"] for t in tickets if t.get("assigned_to")}
+        assignees = {
+            str(doc["_id"]): doc["email"]
+            async for doc in db.users.find(
+                {"_id": {"$in": [ObjectId(i) for i in assignee_ids if ObjectId.is_valid(i)]}}, {"email": 1}
+            )
+        }
+
+        recipients: dict[str, list[dict]] = {admin["email"]: list(tickets) for admin in admins}
+        for ticket in tickets:
+            email = assignees.get(ticket.get("assigned_to"))
+            if email and ticket not in recipients.setdefault(email, []):
+                recipients[email].append(ticket)
+
+        await asyncio.gather(*(
+            email_service.send_sla_breach_email(email, [
+                {
+                    "title": t["title"],
+                    "priority": t["priority"],
+                    "stage": t["breached_stage"].replace("_", " "),
+                    "escalation_level": t.get("escalation_level", 1),
+                }
+                for t in batch
+            ])
+            for email, batch in recipients.items()
+        ))
+
+    def get_stats(self) -> dict:
+        return {
+            "tracked": len(self._heap),
+            "next_due_at": self._heap[0][0].isoformat() if self._heap else None,
+            "escalated": dict(self.escalated),
+            "skipped": self.skipped,
+        }
+
+
+sla_scheduler = SLAScheduler()
@@ -1,13 +1,47 @@
 # app/services/ticket_service.py
 
-from app.models.database import get_database
-from app.models.ticket import TicketInDB, TicketStatus, TicketPriority
+from app.models.ticket import (
+    TicketInDB, TicketStatus, TicketPriority, priority_rank, ticket_adapter, allowed_from_statuses
+)
 from app.models.user import UserRole, UserInDB
-from app.services.ai_service import ai_service
+from app.services.ai_service import ai_service, AIUnavailableError, FALLBACK_MODEL
+from app.services.assignment_service import assign_moderators, skill_match_matrix
+from app.services.sla_service import sla_scheduler, sla_fields, status_update_pipeline
 from app.services.email_service import email_service
+from app.services.event_service import (
+    ticket_events, ticket_event, record_ticket_change, ticket_changes,
+    TICKET_CREATED, TICKET_UPDATED, TICKET_ASSIGNED,
+)
+from app.config import settings
+from app.utils.single_flight import SingleFlight
+from app.utils.tracing import tracer, traced
+from app.utils.structured_logging import bind_log_context
 from bson import ObjectId
 from datetime import datetime
-import re
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reasons update_ticket_status can fail
+NOT_FOUND = "not_found"
+FORBIDDEN = "forbidden"
+INVALID_TRANSITION = "invalid_transition"
+VERSION_CONFLICT = "version_conflict"
+STATUS_UPDATE_ERRORS = (NOT_FOUND, FORBIDDEN, INVALID_TRANSITION, VERSION_CONFLICT)
+
+# Candidates fetched per round trip when claim_next_ticket filters by skills
+CLAIM_SCAN_BATCH = 100
+
+def notification_key(moderator_id: str, ai_version: str | None) -> str:
+    """Stored as `notified` on a ticket: a moderator is emailed once per assignment and analysis."""
+    return f"{moderator_id}:{ai_version}"
+
+# Shared across TicketService instances (one is created per request)
+ticket_reads = SingleFlight("ticket_by_id", ttl=settings.single_flight_ticket_ttl_seconds)
+stats_reads = SingleFlight("ticket_statistics", ttl=settings.single_flight_stats_ttl_seconds)
 
 
 class TicketService:
@@ -17,181 +51,550 @@ class TicketService:
         """
         self.db = db
 
-    async def create_ticket(self, title: str, description: str, user_id: str) -> TicketInDB:
-        """
-        Create a new ticket document and insert it into MongoDB.
-        Then kick off AI processing (to set required_skills, priority, ticket_type, ai_notes, assigned_to).
-        """
-        ticket_data = {
+    @staticmethod
+    def _new_ticket_document(title: str, description: str, user_id: str) -> dict:
+        now = datetime.utcnow()
+        return {
             "title": title,
             "description": description,
             "status": TicketStatus.OPEN,
             "priority": TicketPriority.MEDIUM,
+            "priority_rank": priority_rank(TicketPriority.MEDIUM),
             "ticket_type": None,
             "required_skills": [],
             "ai_notes": None,
             "created_by": user_id,
             "assigned_to": None,
-            "created_at": datetime.utcnow(),
-            "updated_at": None
+            "created_at": now,
+            "updated_at": None,
+            "version": 1,
+            "ai_version": None,
+            "first_response_at": None,
+            **sla_fields(TicketPriority.MEDIUM, now, TicketStatus.OPEN),
+            # Worker mode: marks the ticket as waiting for a triage task (see app.worker)
+            **({"triage_status": "pending"} if settings.triage_backend == "celery" else {}),
         }
 
+    @traced("ticket.create")
+    async def create_ticket(self, title: str, description: str, user_id: str) -> TicketInDB:
+        """
+        Create a new ticket document and insert it into MongoDB.
+        Then kick off AI processing (to set required_skills, priority, ticket_type, ai_notes, assigned_to).
+        """
+        ticket_data = self._new_ticket_document(title, description, user_id)
+
         # Insert into MongoDB
-        result = await self.db.tickets.insert_one(ticket_data)
+        with tracer.span("mongo.insert_ticket"):
+            result = await self.db.tickets.insert_one(ticket_data)
         ticket_data["_id"] = result.inserted_id
+        tracer.set_attributes(ticket_id=str(result.inserted_id))
+        bind_log_context(ticket_id=str(result.inserted_id))
+        await record_ticket_change(self.db)
+        ticket_events.publish_local(ticket_event(TICKET_CREATED, ticket_data))
+        sla_scheduler.track(ticket_data["_id"], ticket_data["sla_due_at"])
 
         # Build Pydantic model from inserted document
-        ticket = TicketInDB(**ticket_data)
+        ticket = ticket_adapter.from_db(ticket_data)
 
-        # Asynchronously process with AI (in the background)
-        await self.process_ticket_with_ai(str(ticket.id))
+        # Process with AI: inline, or hand off to the Celery triage workers
+        # (triaged here instead if the broker is unreachable)
+        if settings.triage_backend == "celery":
+            from app.worker import enqueue_triage_async
+            await enqueue_triage_async([str(ticket.id)])
+        else:
+            await self.process_ticket_with_ai(str(ticket.id))
 
         return ticket
 
-    async def process_ticket_with_ai(self, ticket_id: str):
+    async def create_tickets_bulk(self, items: list[tuple[str, str]], user_id: str) -> list[tuple[TicketInDB | None, str | None]]:
+        """
+        Insert many (title, description) tickets with a single unordered insert_many.
+        Returns one (ticket, error) pair per item, in input order. AI processing is
+        left to the caller so the whole batch can be scheduled together.
+        """
+        docs = []
+        for title, description in items:
+            doc = self._new_ticket_document(title, description, user_id)
+            doc["_id"] = ObjectId()
+            docs.append(doc)
+
+        if not docs:
+            return []
+
+        errors: dict[int, str] = {}
+        try:
+            await self.db.tickets.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error.get("errmsg", "Insert failed")
+        if len(errors) < len(docs):
+            await record_ticket_change(self.db)
+
+        for i, doc in enumerate(docs):
+            if i not in errors:
+                ticket_events.publish_local(ticket_event(TICKET_CREATED, doc))
+                sla_scheduler.track(doc["_id"], doc["sla_due_at"])
+
+        return [
+            (None, errors[i]) if i in errors else (ticket_adapter.from_db(doc), None)
+            for i, doc in enumerate(docs)
+        ]
+
+    @traced("ticket.triage_batch")
+    async def process_tickets_with_ai(self, ticket_ids: list[str]):
+        """
+        Triage a batch of tickets: load them with one query, run the AI analysis
+        with bounded concurrency (settings.ai_batch_concurrency), then assign the
+        whole batch jointly so the backlog is spread across moderators.
+        """
+        tracer.set_attributes(tickets=len(ticket_ids))
+        object_ids = [ObjectId(ticket_id) for ticket_id in ticket_ids]
+        tickets = [
+            ticket_adapter.from_db(doc)
+            async for doc in self.db.tickets.find({"_id": {"$in": object_ids}})
+        ]
+
+        semaphore = asyncio.Semaphore(settings.ai_batch_concurrency)
+
+        async def analyze(ticket: TicketInDB):
+            bind_log_context(ticket_id=str(ticket.id))
+            async with semaphore:
+                try:
+                    return ticket, await self._analyze_ticket(ticket)
+                except Exception as e:
+                    logger.error(f"❌ Error processing ticket with AI: {e}")
+                    return ticket, None
+
+        analyzed = [
+            (ticket, update_data)
+            for ticket, update_data in await asyncio.gather(*(analyze(ticket) for ticket in tickets))
+            if update_data is not None
+        ]
+        if not analyzed:
+            return
+
+        moderators = await assign_moderators(
+            self.db,
+            [update_data["required_skills"] for _, update_data in analyzed],
+            [update_data["priority_rank"] for _, update_data in analyzed],
+        )
+
+        async def save(ticket: TicketInDB, update_data: dict, moderator: UserInDB | None):
+            bind_log_context(ticket_id=str(ticket.id))
+            async with semaphore:
+                try:
+                    await self._save_triage(ticket, update_data, moderator)
+                except Exception as e:
+                    logger.error(f"❌ Error processing ticket with AI: {e}")
+
+        await asyncio.gather(*(
+            save(ticket, update_data, moderator)
+            for (ticket, update_data), moderator in zip(analyzed, moderators)
+        ))
+
+    @traced("ticket.triage")
+    async def process_ticket_with_ai(self, ticket_id: str, raise_errors: bool = False, accept_fallback: bool = True):
         """
         Given a ticket_id, fetch its document, run AI analysis, update fields:
         - required_skills
         - priority
         - ticket_type
         - ai_notes
-        - assigned_to (find a matching moderator or default to an admin)
+        - assigned_to (a matching moderator with spare capacity, else an admin if nobody matches)
+
+        Errors are logged and swallowed unless raise_errors is set (worker retries).
+        Without accept_fallback, a fallback analysis (every model failed) raises
+        AIUnavailableError instead of being saved, so the worker can retry.
         """
+        tracer.set_attributes(ticket_id=ticket_id)
+        bind_log_context(ticket_id=ticket_id)
         try:
             # Fetch the ticket document
             ticket_doc = await self.db.tickets.find_one({"_id": ObjectId(ticket_id)})
-            if not ticket_doc:
-                return
-
-            ticket = TicketInDB(**ticket_doc)
-
-            # Call AI service to analyze title+description
-            ai_analysis = await ai_service.analyze_ticket(ticket.title, ticket.description)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"❌ Error processing ticket with AI: {e}")
+            return
+        if not ticket_doc:
+            return
 
-            update_data = {
-                "required_skills": ai_analysis.get("required_skills", []),
-                "priority": ai_analysis.get("priority", TicketPriority.MEDIUM),
-                "ticket_type": ai_analysis.get("ticket_type", "support"),
-                "ai_notes": ai_analysis.get("helpful_notes", ""),
-                "updated_at": datetime.utcnow()
-            }
+        await self._triage_ticket(ticket_adapter.from_db(ticket_doc), raise_errors, accept_fallback)
 
+    async def _triage_ticket(self, ticket: TicketInDB, raise_errors: bool = False, accept_fallback: bool = True):
+        """Run AI analysis and moderator assignment for an already loaded ticket."""
+        try:
+            update_data = await self._analyze_ticket(ticket)
+            # With no model configured the fallback is all there will ever be
+            if (not accept_fallback and ai_service.providers
+                    and update_data["ai_version"] == ai_service.analysis_version(FALLBACK_MODEL)):
+                raise AIUnavailableError(f"AI analysis of ticket {ticket.id} fell back")
             # Find the best matching moderator (or fallback to an admin)
             assigned_moderator = await self.find_matching_moderator(update_data["required_skills"])
-            if assigned_moderator:
-                update_data["assigned_to"] = str(assigned_moderator.id)
-
-                # If a moderator was found, send them an assignment email
-                ticket_data_for_email = {
-                    "title": ticket.title,
-                    "description": ticket.description,
-                    "priority": update_data["priority"],
-                    "ticket_type": update_data["ticket_type"],
-                    "ai_notes": update_data["ai_notes"]
-                }
-                await email_service.send_ticket_assignment_email(
-                    assigned_moderator.email,
-                    ticket_data_for_email
-                )
-
-            # Update the MongoDB document
-            await self.db.tickets.update_one(
-                {"_id": ObjectId(ticket_id)},
-                {"$set": update_data}
-            )
-
+            await self._save_triage(ticket, update_data, assigned_moderator)
         except Exception as e:
+            if raise_errors:
+                raise
             # Log the exception; do not crash
-            print(f"Error processing ticket with AI: {e}")
+            logger.error(f"❌ Error processing ticket with AI: {e}")
+
+    async def _analyze_ticket(self, ticket: TicketInDB) -> dict:
+        """AI analysis of one ticket, as the fields to $set (without the assignment)."""
+        # Reporter role feeds the AI scheduler's pre-score
+        reporter = None
+        if ObjectId.is_valid(ticket.created_by):
+            reporter = await self.db.users.find_one({"_id": ObjectId(ticket.created_by)}, {"role": 1})
+
+        # Call AI service to analyze title+description
+        ai_analysis = await ai_service.analyze_ticket(
+            ticket.title,
+            ticket.description,
+            reporter_role=reporter.get("role") if reporter else None,
+        )
+
+        update_data = {
+            "required_skills": ai_analysis.get("required_skills", []),
+            "priority": ai_analysis.get("priority", TicketPriority.MEDIUM),
+            "ticket_type": ai_analysis.get("ticket_type", "support"),
+            "ai_notes": ai_analysis.get("helpful_notes", ""),
+            "ai_version": ai_analysis.get("ai_version"),
+        }
+        update_data["priority_rank"] = priority_rank(update_data["priority"])
+        # Deadlines follow the priority the AI picked
+        update_data.update(sla_fields(
+            update_data["priority"], ticket.created_at, ticket.status, ticket.first_response_at is not None
+        ))
+        return update_data
+
+    async def _save_triage(self, ticket: TicketInDB, update_data: dict, assigned_moderator: UserInDB | None):
+        """Store the analysis and assignment, publish the event and email the moderator."""
+        if assigned_moderator:
+            update_data["assigned_to"] = str(assigned_moderator.id)
+            update_data["notified"] = notification_key(update_data["assigned_to"], update_data["ai_version"])
+        # Stamped at write time: a batch may spend minutes between analysis and save
+        update_data["updated_at"] = datetime.utcnow()
+
+        # Update the MongoDB document
+        with tracer.span("mongo.save_triage", ticket_id=str(ticket.id)):
+            previous_doc = await self.db.tickets.find_one_and_update(
+                {"_id": ticket.id},
+                {"$set": update_data, "$inc": {"version": 1}},
+                return_document=ReturnDocument.BEFORE
+            )
+        if previous_doc:
+            await record_ticket_change(self.db)
+            updated_doc = {**previous_doc, **update_data, "version": previous_doc.get("version", 0) + 1}
+            event_type = TICKET_ASSIGNED if assigned_moderator else TICKET_UPDATED
+            ticket_events.publish_local(ticket_event(event_type, updated_doc, previous_doc))
+            sla_scheduler.track(ticket.id, update_data["sla_due_at"])
+
+        # Email the moderator, unless a retry already notified them about this analysis
+        if assigned_moderator and previous_doc and previous_doc.get("notified") != update_data["notified"]:
+            ticket_data_for_email = {
+                "title": ticket.title,
+                "description": ticket.description,
+                "priority": update_data["priority"],
+                "ticket_type": update_data["ticket_type"],
+                "ai_notes": update_data["ai_notes"]
+            }
+            await email_service.send_ticket_assignment_email(
+                assigned_moderator.email,
+                ticket_data_for_email
+            )
 
     async def find_matching_moderator(self, required_skills: list) -> UserInDB | None:
         """
-        Find a moderator whose skills best match the required_skills list.
-        If none match, fall back to returning any admin user.
+        Find a moderator whose skills best match the required_skills list, taking
+        their open-ticket load into account (see assignment_service).
+        If none match, fall back to returning any admin user; if every match is
+        at capacity, return None and leave the ticket in the unassigned queue.
         """
-        moderators = []
-        # Fetch all active moderators
-        async for user_doc in self.db.users.find({
-            "role": UserRole.MODERATOR,
-            "is_active": True
-        }):
-            moderators.append(user_doc)
-
-        best_match = None
-        max_matches = 0
-
-        for mod_doc in moderators:
-            if not mod_doc.get("skills"):
-                continue
-
-            # Count how many required_skills match this moderator's skills
-            matches = sum(
-                1 for req in required_skills
-                if any(re.search(req.lower(), skill.lower()) for skill in mod_doc["skills"])
-            )
-
-            if matches > max_matches:
-                max_matches = matches
-                best_match = mod_doc
-
-        # If no moderator matched, fall back to any admin
-        if not best_match:
-            admin_doc = await self.db.users.find_one({"role": UserRole.ADMIN})
-            if admin_doc:
-                return UserInDB(**admin_doc)
-
-        if best_match:
-            return UserInDB(**best_match)
-
-        return None
+        return (await assign_moderators(self.db, [required_skills]))[0]
 
-    async def get_user_tickets(self, user_id: str, user_role: str) -> list[TicketInDB]:
+    @staticmethod
+    def _visibility_query(user_id: str, user_role: str) -> dict:
         """
-        Retrieve tickets based on the role of the requesting user:
+        Tickets visible to a user:
         - Admin: all tickets
         - Moderator: tickets assigned to them or unassigned tickets
         - User: tickets created by this user
         """
         if user_role == UserRole.ADMIN:
-            query = {}
-        elif user_role == UserRole.MODERATOR:
-            query = {"$or": [{"assigned_to": user_id}, {"assigned_to": None}]}
-        else:
-            query = {"created_by": user_id}
+            return {}
+        if user_role == UserRole.MODERATOR:
+            return {"$or": [{"assigned_to": user_id}, {"assigned_to": None}]}
+        return {"created_by": user_id}
+
+    def _collections(self, include_archived: bool) -> list:
+        """Hot collection, plus the archive when explicitly requested."""
+        if include_archived:
+            return [self.db.tickets, self.db.tickets_archive]
+        return [self.db.tickets]
+
+    async def _find_one_any_tier(self, query: dict, projection: dict | None = None) -> dict | None:
+        """find_one on the hot collection, falling back to the archive so ids keep resolving."""
+        doc = await self.db.tickets.find_one(query, projection)
+        if doc is None:
+            doc = await self.db.tickets_archive.find_one(query, projection)
+        return doc
+
+    async def get_user_tickets(self, user_id: str, user_role: str, include_archived: bool = False) -> list[TicketInDB]:
+        """
+        Retrieve tickets based on the role of the requesting user (see _visibility_query).
+        Only open work (the hot collection) is searched unless include_archived is set.
+        """
+        query = self._visibility_query(user_id, user_role)
 
         tickets: list[TicketInDB] = []
-        cursor = self.db.tickets.find(query).sort("created_at", -1)
-        async for doc in cursor:
-            tickets.append(TicketInDB(**doc))
+        for collection in self._collections(include_archived):
+            docs = await collection.find(query).sort("created_at", -1).to_list(length=None)
+            tickets.extend(ticket_adapter.many_from_db(docs))
+
+        if include_archived:
+            tickets.sort(key=lambda ticket: ticket.created_at, reverse=True)
         return tickets
 
+    async def get_tickets_version(self) -> int:
+        """
+        Change marker for ticket lists: the ticket change counter, bumped after every
+        ticket write (see record_ticket_change). One lookup, and unlike updated_at it
+        follows commit order, so a write can never land behind a marker already served.
+        """
+        return await ticket_changes(self.db)
+
+    async def get_ticket_version(self, ticket_id: str) -> dict | None:
+        """
+        Fetch only the version and ownership fields of a ticket (for conditional GETs).
+        """
+        try:
+            return await self._find_one_any_tier(
+                {"_id": ObjectId(ticket_id)},
+                {"version": 1, "created_by": 1}
+            )
+        except Exception:
+            return None
+
     async def get_ticket_by_id(self, ticket_id: str) -> TicketInDB | None:
         """
-        Fetch a single ticket document by its ObjectId. Return None if not found or invalid ID.
+        Fetch a single ticket document by its ObjectId (hot collection first, then archive).
+        Return None if not found or invalid ID. Concurrent lookups of one id share a query.
         """
+        return await ticket_reads.do(ticket_id, lambda: self._load_ticket_by_id(ticket_id))
+
+    async def _load_ticket_by_id(self, ticket_id: str) -> TicketInDB | None:
         try:
-            doc = await self.db.tickets.find_one({"_id": ObjectId(ticket_id)})
+            doc = await self._find_one_any_tier({"_id": ObjectId(ticket_id)})
             if doc:
-                return TicketInDB(**doc)
+                return ticket_adapter.from_db(doc)
         except Exception:
             pass
         return None
 
-    async def update_ticket_status(self, ticket_id: str, status: TicketStatus) -> bool:
+    async def _restore_from_archive(self, object_id: ObjectId) -> bool:
         """
-        Update the status and updated_at timestamp of a ticket.
-        Return True if a document was modified, False otherwise.
+        Move an archived ticket back to the hot collection (e.g. when it is reopened).
+        The hot copy is written before the archive copy is deleted, so a crash in
+        between leaves the ticket in both tiers (reads prefer the hot one), never in neither.
         """
+        doc = await self.db.tickets_archive.find_one({"_id": object_id})
+        if not doc:
+            return False
+        archived_at = doc.pop("archived_at", None)
         try:
-            result = await self.db.tickets.update_one(
-                {"_id": ObjectId(ticket_id)},
-                {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+            await self.db.tickets.insert_one(doc)
+        except DuplicateKeyError:
+            pass  # already restored (concurrently or by an interrupted earlier call)
+        await record_ticket_change(self.db)
+        await self.db.tickets_archive.delete_one({"_id": object_id, "archived_at": archived_at})
+        return True
+
+    async def update_ticket_status(
+        self,
+        ticket_id: str,
+        status: TicketStatus,
+        moderator_id: str | None = None,
+        expected_version: int | None = None,
+    ) -> tuple[dict | None, str | None]:
+        """
+        Change a ticket's status in one find_one_and_update. The filter encodes the
+        allowed from-statuses (STATUS_TRANSITIONS), the moderator assignment check
+        and, optionally, the expected version. Archived tickets are restored first.
+
+        Returns (updated document, None) on success, otherwise (None, reason) where
+        reason is one of STATUS_UPDATE_ERRORS. Only failures cost an extra read.
+        """
+        if not ObjectId.is_valid(ticket_id):
+            return None, NOT_FOUND
+        object_id = ObjectId(ticket_id)
+
+        query = {"_id": object_id, "status": {"$in": allowed_from_statuses(status)}}
+        if moderator_id is not None:
+            query["assigned_to"] = moderator_id
+        if expected_version is not None:
+            query["version"] = expected_version
+        # Pipeline update: also moves the SLA deadline (see status_update_pipeline)
+        update = status_update_pipeline(status, datetime.utcnow())
+
+        updated_doc = await self.db.tickets.find_one_and_update(
+            query, update, return_document=ReturnDocument.AFTER
+        )
+        if updated_doc:
+            await record_ticket_change(self.db)
+            ticket_events.publish_local(ticket_event(TICKET_UPDATED, updated_doc))
+            sla_scheduler.track(object_id, updated_doc.get("sla_due_at"))
+            return updated_doc, None
+
+        # Work out why nothing matched
+        projection = {"status": 1, "assigned_to": 1, "version": 1}
+        current = await self.db.tickets.find_one({"_id": object_id}, projection)
+        archived = False
+        if current is None:
+            current = await self.db.tickets_archive.find_one({"_id": object_id}, projection)
+            archived = current is not None
+
+        reason = self._status_update_error(current, query)
+        if reason is None and archived and await self._restore_from_archive(object_id):
+            updated_doc = await self.db.tickets.find_one_and_update(
+                query, update, return_document=ReturnDocument.AFTER
             )
-            return result.modified_count > 0
-        except Exception:
-            return False
+            if updated_doc:
+                await record_ticket_change(self.db)
+                ticket_events.publish_local(ticket_event(TICKET_UPDATED, updated_doc))
+                sla_scheduler.track(object_id, updated_doc.get("sla_due_at"))
+                return updated_doc, None
+        # A matching document that did not update was changed concurrently
+        return None, reason or VERSION_CONFLICT
+
+    @staticmethod
+    def _status_update_error(doc: dict | None, query: dict) -> str | None:
+        if doc is None:
+            return NOT_FOUND
+        if "assigned_to" in query and doc.get("assigned_to") != query["assigned_to"]:
+            return FORBIDDEN
+        if doc.get("status") not in query["status"]["$in"]:
+            return INVALID_TRANSITION
+        if "version" in query and doc.get("version", 0) != query["version"]:
+            return VERSION_CONFLICT
+        return None
+
+    async def update_ticket_status_bulk(
+        self, ticket_ids: list[str], status: TicketStatus, moderator_id: str | None = None
+    ) -> dict[str, str | None]:
+        """
+        Set the status of many tickets with a single update_many.
+        When moderator_id is given, only tickets assigned to that moderator are updated
+        (same rule as the single-ticket route). Archived tickets are restored first.
+        Outcomes come from the documents as they are after the write, so a ticket
+        the write did not reach (changed concurrently) is reported as failed and gets no event.
+        Returns {ticket_id: error or None}.
+        """
+        outcomes: dict[str, str | None] = {}
+        object_ids: dict[str, ObjectId] = {}
+        for ticket_id in dict.fromkeys(ticket_ids):
+            if ObjectId.is_valid(ticket_id):
+                object_ids[ticket_id] = ObjectId(ticket_id)
+            else:
+                outcomes[ticket_id] = "Invalid ticket id"
+
+        projection = {"assigned_to": 1, "status": 1}
+        found = {}
+        async for doc in self.db.tickets.find({"_id": {"$in": list(object_ids.values())}}, projection):
+            found[str(doc["_id"])] = doc
+        missing = [object_id for ticket_id, object_id in object_ids.items() if ticket_id not in found]
+        archived = set()
+        if missing:
+            async for doc in self.db.tickets_archive.find({"_id": {"$in": missing}}, projection):
+                found[str(doc["_id"])] = doc
+                archived.add(str(doc["_id"]))
+
+        from_statuses = allowed_from_statuses(status)
+        allowed: list[ObjectId] = []
+        for ticket_id, object_id in object_ids.items():
+            doc = found.get(ticket_id)
+            if doc is None:
+                outcomes[ticket_id] = "Ticket not found"
+            elif moderator_id is not None and doc.get("assigned_to") != moderator_id:
+                outcomes[ticket_id] = "Not authorized to update this ticket"
+            elif doc.get("status") not in from_statuses:
+                outcomes[ticket_id] = f"Cannot change status from {doc.get('status')} to {TicketStatus(status).value}"
+            elif ticket_id in archived and not await self._restore_from_archive(object_id):
+                outcomes[ticket_id] = "Ticket not found"
+            else:
+                allowed.append(object_id)
+                outcomes[ticket_id] = None
+
+        if allowed:
+            # Re-check status (and assignment) in the write itself to close the race window
+            query = {"_id": {"$in": allowed}, "status": {"$in": from_statuses}}
+            if moderator_id is not None:
+                query["assigned_to"] = moderator_id
+            # Millisecond precision, as stored, so the read-back can match it exactly
+            now = datetime.utcnow()
+            now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            result = await self.db.tickets.update_many(query, status_update_pipeline(status, now))
+            if result.modified_count:
+                await record_ticket_change(self.db)
+
+            # Read back what the write did: this update stamped updated_at with `now`, so a
+            # ticket in the target status carrying that stamp was updated by us (whatever
+            # else landed between the pre-read and the write); anything else changed under us
+            updated = {}
+            async for doc in self.db.tickets.find({"_id": {"$in": allowed}, "updated_at": now}):
+                if doc.get("status") == status:
+                    updated[doc["_id"]] = doc
+            for object_id in allowed:
+                doc = updated.get(object_id)
+                if doc is None:
+                    outcomes[str(object_id)] = "Ticket was modified by someone else; reload and retry"
+                    continue
+                ticket_events.publish_local(ticket_event(TICKET_UPDATED, doc))
+                sla_scheduler.track(object_id, doc.get("sla_due_at"))
+
+        return outcomes
+
+    async def claim_next_ticket(self, moderator_id: str, skills: list[str] | None = None) -> TicketInDB | None:
+        """
+        Atomically assign the highest-priority, oldest unassigned open ticket to a moderator.
+        Tickets still waiting for AI triage are skipped, since saving the triage assigns them.
+        With skills given, only tickets needing a skill the moderator covers (matched like
+        automatic assignment, see skill_match_matrix) or "general" qualify; candidates are
+        scanned in claim order. Each claim is a conditional find_one_and_update, so two
+        moderators can never claim the same ticket.
+        """
+        query = {"assigned_to": None, "status": TicketStatus.OPEN, "ai_version": {"$ne": None}}
+        sort = [("priority_rank", -1), ("created_at", 1)]
+        if skills is None:
+            return await self._claim(query, moderator_id, sort)
+
+        offered = [list(skills) + ["general"]]
+        cursor = self.db.tickets.find(query, {"required_skills": 1}).sort(sort)
+        while batch := await cursor.to_list(length=CLAIM_SCAN_BATCH):
+            covered = skill_match_matrix([doc.get("required_skills") or [] for doc in batch], offered)[:, 0]
+            for doc, matches in zip(batch, covered):
+                # Re-checks the query, so a ticket claimed meanwhile is just skipped
+                if matches and (ticket := await self._claim({**query, "_id": doc["_id"]}, moderator_id)):
+                    return ticket
+        return None
+
+    async def _claim(self, query: dict, moderator_id: str, sort: list | None = None) -> TicketInDB | None:
+        doc = await self.db.tickets.find_one_and_update(
+            query,
+            {"$set": {"assigned_to": moderator_id, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            sort=sort,
+            return_document=ReturnDocument.AFTER
+        )
+        if not doc:
+            return None
+        await record_ticket_change(self.db)
+        # The query only matches unassigned tickets
+        ticket_events.publish_local(ticket_event(TICKET_ASSIGNED, doc, {"assigned_to": None}))
+        return ticket_adapter.from_db(doc)
 
     async def get_ticket_statistics(self) -> dict:
+        """Dashboard statistics; concurrent callers share one aggregation (see _compute_ticket_statistics)."""
+        return await stats_reads.do("dashboard", self._compute_ticket_statistics)
+
+    async def _compute_ticket_statistics(self) -> dict:
         """
         Aggregate ticket statistics for an admin dashboard:
         - Total tickets
@@ -199,6 +602,7 @@ class TicketService:
         - In-progress tickets
         - Resolved tickets
         - Urgent priority tickets
+        Counts cover the hot collection; archived tickets are reported separately.
         """
         pipeline = [
             {
@@ -214,6 +618,8 @@ class TicketService:
         ]
 
         result = await self.db.tickets.aggregate(pipeline).to_list(length=1)
+        # Metadata count, no collection scan
+        archived = await self.db.tickets_archive.estimated_document_count()
         if result:
             stats = result[0]
             return {
@@ -222,7 +628,8 @@ class TicketService:
                 "in_progress": stats.get("in_progress", 0),
                 "resolved": stats.get("resolved", 0),
                 "urgent": stats.get("urgent", 0),
+                "archived": archived,
             }
 
-        return {"total": 0, "open": 0, "in_progress": 0, "resolved": 0, "urgent": 0}
+        return {"total": 0, "open": 0, "in_progress": 0, "resolved": 0, "urgent": 0, "archived": archived}
 
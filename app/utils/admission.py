@@ -0,0 +1,175 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+from app.config import settings
+from app.utils.tracing import tracer
+
+# Long-lived or trivial endpoints that never queue
+EXEMPT_PATHS = ("/api/tickets/events",)
+
+
+def route_class(method: str, path: str) -> str | None:
+    """Bulkhead for a request, or None if it bypasses admission control."""
+    if not path.startswith("/api/") or path.startswith(EXEMPT_PATHS) or method == "OPTIONS":
+        return None
+    if path.startswith("/api/admin"):
+        return "admin"
+    if method == "POST" and path.rstrip("/") in ("/api/tickets", "/api/tickets/bulk"):
+        return "triage"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """
+    At most `limit` requests of one route class run at once; up to `max_queue`
+    more wait for at most `queue_timeout` seconds. A request is shed straight
+    away when the queue is full or when the queue depth times the observed
+    service time says it could not start before its deadline.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        # EWMA of request service time; rises when Gemini or Mongo slow down
+        self.service_seconds = 0.0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {"queue_full": 0, "predicted_timeout": 0, "timeout": 0}
+        self.queue_waits = deque(maxlen=500)
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) * self.service_seconds / self.limit
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.expected_wait()))
+
+    async def acquire(self):
+        if self.active < self.limit and not self.waiting:
+            await self._semaphore.acquire()
+            self.active += 1
+            self.admitted += 1
+            self.queue_waits.append(0.0)
+            return
+
+        if self.waiting >= self.max_queue:
+            self.shed["queue_full"] += 1
+            raise Overloaded("queue_full", self.retry_after())
+        if self.expected_wait() > self.queue_timeout:
+            self.shed["predicted_timeout"] += 1
+            raise Overloaded("predicted_timeout", self.retry_after())
+
+        self.waiting += 1
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed["timeout"] += 1
+            raise Overloaded("timeout", self.retry_after())
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        self.queue_waits.append(time.perf_counter() - start)
+
+    def release(self, service_seconds: float):
+        self.active -= 1
+        self._semaphore.release()
+        if self.service_seconds:
+            self.service_seconds += 0.1 * (service_seconds - self.service_seconds)
+        else:
+            self.service_seconds = service_seconds
+
+    def get_stats(self) -> dict:
+        waits = sorted(self.queue_waits)
+        pct = lambda p: round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else None
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "service_seconds_ewma": round(self.service_seconds, 4),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+            "queue_wait_p50_seconds": pct(0.50),
+            "queue_wait_p95_seconds": pct(0.95),
+        }
+
+
+class AdmissionController:
+    def __init__(self):
+        limits = {
+            "triage": settings.admission_triage_concurrency,
+            "write": settings.admission_write_concurrency,
+            "read": settings.admission_read_concurrency,
+            "admin": settings.admission_admin_concurrency,
+        }
+        self.bulkheads = {
+            name: Bulkhead(name, limit, settings.admission_max_queue, settings.admission_queue_timeout_seconds)
+            for name, limit in limits.items()
+        }
+
+    def get_stats(self) -> dict:
+        return {name: bulkhead.get_stats() for name, bulkhead in self.bulkheads.items()}
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware: runs each API request inside its route class's bulkhead."""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        bulkhead = self.controller.bulkheads[name]
+        try:
+            with tracer.span("admission.wait", route_class=name):
+                await bulkhead.acquire()
+        except Overloaded as e:
+            await self._reject(send, e)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            bulkhead.release(time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(send, error: Overloaded):
+        body = json.dumps({"detail": "Server busy, please retry", "reason": error.reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(error.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
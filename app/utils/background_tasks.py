@@ -1,13 +1,16 @@
 import asyncio
+from app.config import settings
 from app.models.database import get_database
 from app.services.ticket_service import TicketService
+from app.utils.tracing import tracer
 
 class BackgroundTasks:
     def __init__(self):
         self.tasks = []
 
     def add_task(self, coro):
-        task = asyncio.create_task(coro)
+        # The task continues the caller's trace, which stays open until it finishes
+        task = asyncio.create_task(tracer.bind(coro))
         self.tasks.append(task)
         # Remove any tasks that have already completed
         self.tasks = [t for t in self.tasks if not t.done()]
@@ -29,3 +32,19 @@ def process_ticket_async(ticket_id: str):
     return background_tasks.add_task(
         service.process_ticket_with_ai(ticket_id)
     )
+
+
+def process_tickets_batch_async(ticket_ids: list[str]):
+    """
+    Schedule AI processing for a whole batch of tickets as one background task
+    (or enqueue it for the Celery triage workers).
+    """
+    if settings.triage_backend == "celery":
+        from app.worker import enqueue_triage_async
+        return background_tasks.add_task(enqueue_triage_async(ticket_ids))
+
+    db = get_database()
+    service = TicketService(db)
+    return background_tasks.add_task(
+        service.process_tickets_with_ai(ticket_ids)
+    )
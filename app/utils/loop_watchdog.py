@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+
+
+def _frame_label(frame_summary: traceback.FrameSummary) -> str:
+    filename = frame_summary.filename
+    if filename.startswith(_ROOT_DIR):
+        filename = os.path.relpath(filename, _ROOT_DIR)
+    return f"{filename}:{frame_summary.lineno} in {frame_summary.name}"
+
+
+class LoopWatchdog:
+    """
+    Opt-in detector for synchronous work on the event loop (LOOP_WATCHDOG_ENABLED).
+
+    A heartbeat coroutine stamps the time every loop_watchdog_interval_ms. A
+    daemon thread checks the stamp; once the loop has missed it by more than
+    loop_watchdog_threshold_ms it grabs the loop thread's stack, i.e. the code
+    that is blocking right now, and the task that is running. When the loop
+    comes back the heartbeat records the stall with its full duration, logs
+    it and counts it against the innermost app frame ("site"), so get_stats()
+    ranks call sites by total time blocked.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._beat = 0.0
+        self._captured: dict | None = None
+        self.reports = deque(maxlen=settings.loop_watchdog_max_reports)
+        self.stalls = 0
+        self.total_stall_ms = 0.0
+        self.max_stall_ms = 0.0
+        self.site_counts: Counter = Counter()
+        self.site_ms: Counter = Counter()
+
+    async def start(self):
+        if not settings.loop_watchdog_enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"🐶 Event-loop watchdog on (threshold {settings.loop_watchdog_threshold_ms}ms).")
+
+    async def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+        self._thread = None
+
+    async def _heartbeat(self):
+        interval = settings.loop_watchdog_interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            stalled_ms = (now - self._beat - interval) * 1000
+            self._beat = now
+            with self._lock:
+                captured, self._captured = self._captured, None
+            if stalled_ms > settings.loop_watchdog_threshold_ms:
+                self._record(stalled_ms, captured)
+
+    def _watch(self):
+        interval = settings.loop_watchdog_interval_ms / 1000
+        threshold = settings.loop_watchdog_threshold_ms / 1000
+        while not self._stop.wait(interval):
+            if self._captured is None and time.monotonic() - self._beat > interval + threshold:
+                captured = self._capture()
+                with self._lock:
+                    self._captured = captured
+
+    def _capture(self) -> dict:
+        """Stack of the loop thread and the task it is running (called from the watchdog thread)."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame)[-settings.loop_watchdog_stack_depth:] if frame else []
+        task = asyncio.current_task(self._loop)
+        coro = task.get_coro() if task else None
+        return {
+            "task": task.get_name() if task else None,
+            "coroutine": getattr(coro, "__qualname__", None),
+            "stack": [_frame_label(f) for f in stack],
+            "site": next(
+                (_frame_label(f) for f in reversed(stack) if os.path.abspath(f.filename).startswith(_APP_DIR)),
+                _frame_label(stack[-1]) if stack else "unknown",
+            ),
+        }
+
+    def _record(self, stalled_ms: float, captured: dict | None):
+        captured = captured or {"task": None, "coroutine": None, "stack": [], "site": "unknown"}
+        stalled_ms = round(max(stalled_ms, 0.0), 1)
+        self.stalls += 1
+        self.total_stall_ms += stalled_ms
+        self.max_stall_ms = max(self.max_stall_ms, stalled_ms)
+        self.site_counts[captured["site"]] += 1
+        self.site_ms[captured["site"]] += stalled_ms
+        self.reports.append({"at": datetime.utcnow().isoformat(), "stalled_ms": stalled_ms, **captured})
+        logger.warning(
+            f"🐢 Event loop blocked for {stalled_ms}ms at {captured['site']} "
+            f"(task {captured['task']}, {captured['coroutine']}):\n  " + "\n  ".join(captured["stack"])
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": settings.loop_watchdog_enabled,
+            "threshold_ms": settings.loop_watchdog_threshold_ms,
+            "stalls": self.stalls,
+            "total_stall_ms": round(self.total_stall_ms, 1),
+            "max_stall_ms": self.max_stall_ms,
+            "top_sites": [
+                {"site": site, "stalls": self.site_counts[site], "total_ms": round(total_ms, 1)}
+                for site, total_ms in self.site_ms.most_common(10)
+            ],
+            "recent": list(reversed(self.reports)),
+        }
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,93 @@
+import math
+import re
+
+# Rough but stable: Gemini tokenizers average ~4 characters per token on English/log text
+CHARS_PER_TOKEN = 4
+
+_BASE64_RE = re.compile(r"(?:data:[\w/+.-]+;base64,)?[A-Za-z0-9+/]{120,}={0,2}")
+# Parts of a log line that change between otherwise identical lines
+_VOLATILE_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"  # timestamps
+    r"|0x[0-9a-fA-F]+|\b[0-9a-fA-F]{8,}\b|\d+"
+)
+_TRACE_START_RE = re.compile(
+    r"^\s*(Traceback \(most recent call last\):|Exception in thread|Caused by:|[\w.$]+(Exception|Error)(:|$))"
+)
+_FRAME_RE = re.compile(r"^\s+(at |File \"|\.\.\. \d+ more)|^\s{2,}\S")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def strip_base64(text: str) -> str:
+    return _BASE64_RE.sub(lambda m: f"[base64 data, {len(m.group())} chars removed]", text)
+
+
+def dedupe_log_lines(lines: list[str]) -> list[str]:
+    """Collapse runs of lines that only differ in timestamps, ids or numbers."""
+    result: list[str] = []
+    previous_key = None
+    repeats = 0
+    for line in lines:
+        key = _VOLATILE_RE.sub("#", line.strip())
+        if key and key == previous_key:
+            repeats += 1
+            continue
+        if repeats:
+            result.append(f"    ... previous line repeated {repeats} more time(s)")
+        result.append(line)
+        previous_key = key
+        repeats = 0
+    if repeats:
+        result.append(f"    ... previous line repeated {repeats} more time(s)")
+    return result
+
+
+def trim_stack_traces(lines: list[str], keep_frames: int) -> list[str]:
+    """Keep the first and last `keep_frames` frame lines of every stack trace."""
+    result: list[str] = []
+    i = 0
+    while i < len(lines):
+        result.append(lines[i])
+        if not _TRACE_START_RE.match(lines[i]):
+            i += 1
+            continue
+
+        # Collect the frame lines that follow the trace header
+        j = i + 1
+        while j < len(lines) and _FRAME_RE.match(lines[j]):
+            j += 1
+        frames = lines[i + 1:j]
+        if len(frames) > 2 * keep_frames:
+            omitted = len(frames) - 2 * keep_frames
+            frames = frames[:keep_frames] + [f"    ... {omitted} frame line(s) omitted ..."] + frames[-keep_frames:]
+        result.extend(frames)
+        i = j
+    return result
+
+
+def head_and_tail(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    half = max_chars // 2
+    omitted = len(text) - 2 * half
+    return f"{text[:half]}\n... [{omitted} chars omitted] ...\n{text[-half:]}"
+
+
+def compact_description(description: str, token_budget: int, keep_frames: int = 5) -> str:
+    """
+    Shrink a ticket description to roughly `token_budget` tokens for the prompt:
+    strip base64 blobs, collapse repeated log lines, trim stack traces, and as a
+    last resort keep only the head and tail. Short descriptions are returned as-is.
+    """
+    if estimate_tokens(description) <= token_budget:
+        return description
+
+    text = strip_base64(description)
+    lines = text.splitlines()
+    lines = dedupe_log_lines(lines)
+    lines = trim_stack_traces(lines, keep_frames)
+    text = "\n".join(lines)
+
+    return head_and_tail(text, token_budget * CHARS_PER_TOKEN)
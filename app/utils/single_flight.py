@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+# Every group, by name, for the stats endpoint
+_groups: dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical reads: while a call for `key` is in flight,
+    further calls for the same key await its result instead of querying again.
+    With `ttl` > 0 the result is also reused for that many seconds afterwards.
+
+    Results are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, name: str, ttl: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._cache: dict[Hashable, tuple[float, Any]] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if self.ttl > 0:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.cache_hits += 1
+                return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            # A task, so a caller that disconnects does not cancel the query for the others
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if self.ttl > 0 and not task.cancelled() and task.exception() is None:
+            if len(self._cache) > 10_000:
+                self._cache.clear()
+            self._cache[key] = (time.monotonic() + self.ttl, task.result())
+
+    def invalidate(self, key: Hashable):
+        """Drop a cached result (after a write) and detach any in-flight call."""
+        self._cache.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def get_stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl,
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._inflight),
+        }
+
+
+def get_single_flight_stats() -> dict:
+    return {name: group.get_stats() for name, group in _groups.items()}
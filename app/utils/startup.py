@@ -0,0 +1,33 @@
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long each startup phase took, for the startup report."""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = round(seconds, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> dict:
+        return {"phases": dict(self.phases), "total_seconds": round(sum(self.phases.values()), 4)}
+
+    def log_report(self):
+        details = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        logger.info(f"🚀 Startup phases: {details}")
+
+
+startup_timer = StartupTimer()
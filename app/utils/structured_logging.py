@@ -0,0 +1,197 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import settings
+from app.utils.tracing import tracer
+
+# Request-scoped fields added to every record (request_id, user_id, ticket_id, ...)
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "context"}
+
+
+def bind_log_context(**fields):
+    """Attach fields to every log record of the current request/task (and tasks it starts)."""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development (LOG_FORMAT=text)."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = " ".join(f"{k}={v}" for k, v in getattr(record, "context", {}).items())
+        return f"{line} [{context}]" if context else line
+
+
+class SiteRateLimitFilter(logging.Filter):
+    """
+    At most log_rate_limit_per_site warnings per call site (file:line) per window,
+    so a hot-path warning (e.g. the AI fallback) cannot flood the log; other
+    levels always pass. The first warning let through in the next window
+    reports how many were suppressed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._windows: dict[tuple, list] = {}  # site -> [window start, count, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        limit = settings.log_rate_limit_per_site
+        if limit <= 0 or record.levelno != logging.WARNING:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        window = self._windows.get(site)
+        if window is None or now - window[0] >= settings.log_rate_limit_window_seconds:
+            suppressed = window[2] if window else 0
+            if len(self._windows) > 10_000:
+                self._windows.clear()
+            self._windows[site] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if window[1] < limit:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. On the calling thread it only resolves
+    the message, captures the request context and trace id, and renders a
+    traceback; formatting and the stdout write happen on the writer thread.
+    A full queue drops the record instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        context = dict(_log_context.get())
+        trace_id = tracer.current_trace_id()
+        if trace_id:
+            context["trace_id"] = trace_id
+        record.context = context
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: QueueListener | None = None
+_queue_handler: ContextQueueHandler | None = None
+
+
+def configure_logging():
+    """
+    Route the root logger (and uvicorn's loggers) through a bounded queue to a
+    background writer thread, so no request ever waits on stdout. Idempotent.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(TextFormatter() if settings.log_format == "text" else JsonFormatter())
+
+    _queue_handler = ContextQueueHandler(log_queue)
+    _queue_handler.addFilter(SiteRateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.log_level.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats() -> dict:
+    return {
+        "queued": _listener.queue.qsize() if _listener else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+    }
+
+
+class RequestContextMiddleware:
+    """ASGI middleware: a request id per request (X-Request-Id, honoured if sent) in every log record."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = _log_context.set({"request_id": request_id})
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _log_context.reset(token)
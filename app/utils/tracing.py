@@ -0,0 +1,304 @@
+import asyncio
+import functools
+import importlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Long-lived streams (same as admission.EXEMPT_PATHS): one span per connection is not useful
+EXEMPT_PATHS = ("/api/tickets/events",)
+
+
+class _Trace:
+    """Spans of one trace in this process; complete once no span (or held task) is open."""
+
+    __slots__ = ("trace_id", "spans", "open", "dropped", "error")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list["Span"] = []
+        self.open = 0
+        self.dropped = 0
+        self.error = False
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "wall_start", "start", "end", "error")
+
+    def __init__(self, trace: _Trace, parent_id: str | None, name: str, attributes: dict):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.error: str | None = None
+
+    def to_dict(self, trace_start: float) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self.start - trace_start) * 1000, 3),
+            "duration_ms": round(((self.end or self.start) - self.start) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class SpanExporter(ABC):
+    """Receives every sampled trace as a dict. Subclass and point TRACING_EXPORTER at it."""
+
+    @abstractmethod
+    def export(self, trace: dict):
+        ...
+
+    def shutdown(self):
+        pass
+
+
+class JsonFileExporter(SpanExporter):
+    """One JSON line per trace in tracing_file_path, written by a background thread."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.tracing_file_path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: dict):
+        self._queue.put(json.dumps(trace, default=str))
+
+    def _write(self):
+        with open(self.path, "a") as f:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    return
+                f.write(line + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class LogExporter(SpanExporter):
+    """Logs each sampled trace as a per-span breakdown."""
+
+    def export(self, trace: dict):
+        lines = [
+            f"  {span['offset_ms']:>9.1f}ms +{span['duration_ms']:.1f}ms  {span['name']}"
+            + (f"  ❌ {span['error']}" if span["error"] else "")
+            for span in trace["spans"]
+        ]
+        logger.info(f"🧵 Trace {trace['trace_id']} ({trace['root']}) took {trace['duration_ms']}ms:\n" + "\n".join(lines))
+
+
+EXPORTERS = {"file": JsonFileExporter, "log": LogExporter}
+
+
+def load_exporter(name: str) -> SpanExporter:
+    """A built-in exporter ("file", "log") or any SpanExporter as "package.module:ClassName"."""
+    if name in EXPORTERS:
+        return EXPORTERS[name]()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class Tracer:
+    """
+    Lightweight in-process tracing (TRACING_ENABLED).
+
+    Spans nest through a context variable, so they follow awaits and the tasks
+    created by asyncio.gather/create_task. A trace is finished when its last open
+    span ends; bind() keeps it open for a background task started from a request.
+    Finished traces are tail-sampled: a trace is exported when it took at least
+    tracing_slow_ms, had an error, or falls within tracing_sample_rate. Other
+    processes (Celery workers) continue a trace from inject()'s context.
+    """
+
+    def __init__(self):
+        self._exporter: SpanExporter | None = None
+        self.traces = 0
+        self.exported = 0
+
+    @property
+    def exporter(self) -> SpanExporter:
+        if self._exporter is None:
+            self._exporter = load_exporter(settings.tracing_exporter)
+        return self._exporter
+
+    @contextmanager
+    def span(self, name: str, parent: dict | None = None, **attributes):
+        """Time a block as a child of the current span (or of a propagated `parent` context)."""
+        if not settings.tracing_enabled:
+            yield None
+            return
+
+        current = _current_span.get()
+        if current is not None:
+            trace, parent_id = current.trace, current.span_id
+        else:
+            self.traces += 1
+            trace = _Trace((parent or {}).get("trace_id") or os.urandom(16).hex())
+            parent_id = (parent or {}).get("span_id")
+
+        span = Span(trace, parent_id, name, attributes)
+        if len(trace.spans) < settings.tracing_max_spans_per_trace:
+            trace.spans.append(span)
+        else:
+            trace.dropped += 1
+        trace.open += 1
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            # Expected, e.g. the losing ai.generate calls of a hedged request
+            span.attributes["cancelled"] = True
+            raise
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            trace.error = True
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            self._release(trace)
+
+    def set_attributes(self, **attributes):
+        """Add attributes to the current span (no-op outside a span)."""
+        span = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def current_trace_id(self) -> str | None:
+        span = _current_span.get()
+        return span.trace.trace_id if span else None
+
+    def inject(self) -> dict | None:
+        """Context to hand to another process, for span(..., parent=context) there."""
+        span = _current_span.get()
+        return {"trace_id": span.trace.trace_id, "span_id": span.span_id} if span else None
+
+    def bind(self, coro):
+        """Keep the current trace open until `coro` (run as a background task) finishes."""
+        span = _current_span.get()
+        if span is None:
+            return coro
+        trace = span.trace
+        trace.open += 1
+
+        async def run():
+            try:
+                return await coro
+            finally:
+                self._release(trace)
+
+        return run()
+
+    def _release(self, trace: _Trace):
+        trace.open -= 1
+        if trace.open > 0 or not trace.spans:
+            return
+        start = min(span.start for span in trace.spans)
+        end = max(span.end or span.start for span in trace.spans)
+        duration_ms = (end - start) * 1000
+        if not (
+            duration_ms >= settings.tracing_slow_ms
+            or trace.error
+            or random.random() < settings.tracing_sample_rate
+        ):
+            return
+        self.exported += 1
+        root = trace.spans[0]
+        try:
+            self.exporter.export({
+                "trace_id": trace.trace_id,
+                "root": root.name,
+                "start": root.wall_start,
+                "duration_ms": round(duration_ms, 3),
+                "error": trace.error,
+                "dropped_spans": trace.dropped,
+                "spans": [span.to_dict(start) for span in trace.spans],
+            })
+        except Exception as e:
+            logger.error(f"❌ Trace export failed: {e}")
+
+    def shutdown(self):
+        if self._exporter is not None:
+            self._exporter.shutdown()
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": settings.tracing_enabled,
+            "exporter": settings.tracing_exporter,
+            "slow_ms": settings.tracing_slow_ms,
+            "sample_rate": settings.tracing_sample_rate,
+            "traces": self.traces,
+            "exported": self.exported,
+        }
+
+
+tracer = Tracer()
+
+
+def traced(name: str):
+    """Decorator: run an async function inside tracer.span(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one root span per HTTP request, continuing an incoming W3C
+    `traceparent` header, and the trace id returned as X-Trace-Id. The event
+    stream (EXEMPT_PATHS) is not traced.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                parts = value.decode("latin-1").split("-")
+                if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                    parent = {"trace_id": parts[1], "span_id": parts[2]}
+                break
+
+        with tracer.span(f"HTTP {scope['method']} {scope['path']}", parent=parent) as span:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    span.attributes["status_code"] = message["status"]
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.trace.trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
@@ -0,0 +1,154 @@
+# app/worker.py
+
+"""
+Celery worker mode for AI triage.
+
+With TRIAGE_BACKEND=celery the API processes only enqueue ticket ids and
+triage runs here, so throughput scales with worker processes/nodes:
+
+    celery -A app.worker worker --loglevel=info -Q triage
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from celery import Celery
+from pymongo.errors import ConnectionFailure
+
+from app.config import settings
+from app.models.database import connect_to_mongo, get_database
+from app.services.ai_service import AIUnavailableError
+from app.services.ticket_service import TicketService
+from app.utils.tracing import tracer
+from app.utils.structured_logging import bind_log_context
+
+celery_app = Celery("ai_ticket_system", broker=settings.celery_broker_url or settings.redis_url)
+celery_app.conf.update(
+    task_acks_late=True,  # only ack after triage finished, so a crash redelivers the ticket
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    task_default_queue="triage",
+    # Give up publishing quickly when the broker is down; the API then triages in-process
+    task_publish_retry_policy={"max_retries": 2, "interval_start": 0, "interval_step": 0.2, "interval_max": 0.5},
+)
+
+logger = logging.getLogger(__name__)
+
+# Transient failures worth another attempt; anything else fails the task straight away
+RETRYABLE_ERRORS = (AIUnavailableError, ConnectionFailure, asyncio.TimeoutError)
+
+# One event loop (and Motor client) per worker process, created on first task
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run(coro):
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        _loop.run_until_complete(connect_to_mongo())
+    return _loop.run_until_complete(coro)
+
+
+async def triage_once(ticket_id: str, accept_fallback: bool = True) -> str:
+    """
+    Idempotent triage of one ticket: claim a lease on the ticket document,
+    run the AI pipeline, then mark it done. Duplicate deliveries of a
+    finished (or currently leased) ticket, and unknown tickets, are skipped.
+    Without accept_fallback a fallback analysis raises AIUnavailableError.
+    """
+    if not ObjectId.is_valid(ticket_id):
+        logger.warning(f"⚠️ Skipping triage of invalid ticket id {ticket_id!r}.")
+        return "invalid"
+    db = get_database()
+    object_id = ObjectId(ticket_id)
+    now = datetime.utcnow()
+
+    claimed = await db.tickets.find_one_and_update(
+        {
+            "_id": object_id,
+            "triage_status": {"$ne": "done"},
+            "$or": [{"triage_lease_until": None}, {"triage_lease_until": {"$lt": now}}],
+        },
+        {"$set": {
+            "triage_status": "processing",
+            "triage_lease_until": now + timedelta(seconds=settings.triage_lease_seconds),
+        }},
+    )
+    if not claimed:
+        return "skipped"
+
+    try:
+        await TicketService(db).process_ticket_with_ai(ticket_id, raise_errors=True, accept_fallback=accept_fallback)
+    except Exception:
+        # Release the lease so the retry can claim it straight away
+        await db.tickets.update_one(
+            {"_id": object_id},
+            {"$set": {"triage_status": "pending", "triage_lease_until": None}},
+        )
+        raise
+
+    await db.tickets.update_one(
+        {"_id": object_id},
+        {"$set": {"triage_status": "done", "triage_lease_until": None}},
+    )
+    return "done"
+
+
+@celery_app.task(
+    bind=True,
+    name="tickets.triage",
+    autoretry_for=RETRYABLE_ERRORS,
+    retry_backoff=True,
+    retry_backoff_max=300,
+    retry_jitter=True,
+    max_retries=settings.triage_max_retries,
+)
+def triage_ticket(self, ticket_id: str, trace_context: dict | None = None) -> str:
+    # The last attempt keeps the fallback analysis rather than leaving the ticket untriaged
+    accept_fallback = self.request.retries >= self.max_retries
+    return _run(_traced_triage(ticket_id, trace_context, accept_fallback))
+
+
+async def _traced_triage(ticket_id: str, trace_context: dict | None, accept_fallback: bool = True) -> str:
+    # Continues the trace of the API request that enqueued the ticket
+    bind_log_context(ticket_id=ticket_id)
+    with tracer.span("worker.triage", parent=trace_context, ticket_id=ticket_id):
+        return await triage_once(ticket_id, accept_fallback)
+
+
+def enqueue_triage(ticket_ids: list[str], trace_context: dict | None = None):
+    """Publish one triage task per ticket (task id = ticket id, for tracing duplicates)."""
+    for ticket_id in ticket_ids:
+        triage_ticket.apply_async(
+            args=[ticket_id], kwargs={"trace_context": trace_context}, task_id=f"triage-{ticket_id}"
+        )
+
+
+async def enqueue_triage_async(ticket_ids: list[str]):
+    """
+    Enqueue from the API without blocking the event loop on the broker round trip.
+    If the broker cannot be reached the tickets are triaged in this process instead,
+    through triage_once, so a task that did get published does not triage twice.
+    """
+    loop = asyncio.get_running_loop()
+    with tracer.span("celery.enqueue", tickets=len(ticket_ids)):
+        try:
+            await loop.run_in_executor(None, enqueue_triage, ticket_ids, tracer.inject())
+            return
+        except Exception as e:
+            tracer.set_attributes(enqueue_failed=True)
+            logger.error(f"❌ Could not enqueue triage of {len(ticket_ids)} ticket(s), triaging in-process: {e}")
+
+    semaphore = asyncio.Semaphore(settings.ai_batch_concurrency)
+
+    async def triage(ticket_id: str):
+        async with semaphore:
+            try:
+                await triage_once(ticket_id)
+            except Exception as e:
+                logger.error(f"❌ In-process triage of ticket {ticket_id} failed: {e}")
+
+    await asyncio.gather(*(triage(ticket_id) for ticket_id in ticket_ids))
@@ -0,0 +1,115 @@
+# benchmarks/bench_models.py
+
+"""
+Micro-benchmark of MongoDB document -> model conversion.
+
+Compares the previous pydantic-v1-style models (custom PyObjectId with
+__get_validators__, v1 Config keys) against the shared pydantic 2 ObjectId
+type, the list TypeAdapter and the trusted-document fast path.
+
+    python -m benchmarks.bench_models --docs 1000 --repeat 20
+"""
+
+import argparse
+import json
+import timeit
+import warnings
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from app.models.ticket import TicketInDB, ticket_adapter
+
+
+class _LegacyObjectId(ObjectId):
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v, field):
+        if not ObjectId.is_valid(v):
+            raise ValueError("Invalid objectid")
+        return ObjectId(v)
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, field_schema):
+        field_schema.update(type="string")
+
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+
+    class LegacyTicketInDB(BaseModel):
+        id: _LegacyObjectId = Field(default_factory=_LegacyObjectId, alias="_id")
+        title: str
+        description: str
+        status: str = "open"
+        priority: str = "medium"
+        ticket_type: Optional[str] = None
+        required_skills: List[str] = Field(default_factory=list)
+        ai_notes: Optional[str] = None
+        created_by: str
+        assigned_to: Optional[str] = None
+        created_at: datetime = Field(default_factory=datetime.utcnow)
+        updated_at: Optional[datetime] = None
+
+        class Config:
+            allow_population_by_field_name = True
+            arbitrary_types_allowed = True
+            json_encoders = {ObjectId: str}
+
+
+def make_docs(n: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Ticket {i}",
+            "description": "The service returns 500 when saving the profile form. " * 4,
+            "status": "open",
+            "priority": "high",
+            "priority_rank": 2,
+            "ticket_type": "bug",
+            "required_skills": ["python", "mongodb"],
+            "ai_notes": "Check the profile serializer.",
+            "created_by": str(ObjectId()),
+            "assigned_to": str(ObjectId()),
+            "created_at": now,
+            "updated_at": now,
+            "version": 3,
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document -> model conversion")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Optional JSON result file")
+    args = parser.parse_args()
+
+    docs = make_docs(args.docs)
+    cases = {
+        "legacy_v1_style": lambda: [LegacyTicketInDB(**doc) for doc in docs],
+        "validate_each": lambda: [TicketInDB.model_validate(doc) for doc in docs],
+        "validate_list_adapter": lambda: ticket_adapter.validate_many(docs),
+        "trusted_construct": lambda: [ticket_adapter.construct(doc) for doc in docs],
+    }
+
+    results = {}
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = {"us_per_doc": round(best / args.docs * 1e6, 3)}
+        print(f"{name:<24}{results[name]['us_per_doc']:>10.3f} µs/doc")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"docs": args.docs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
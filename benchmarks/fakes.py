@@ -0,0 +1,148 @@
+# benchmarks/fakes.py
+
+"""
+Local stand-ins for the external services the API talks to:
+an in-memory MongoDB, a fake Gemini model and an SMTP sink.
+"""
+
+import asyncio
+import json
+import random
+import time
+
+
+def create_memory_mongo_client():
+    """
+    Return an async, in-memory MongoDB client with the Motor API.
+    """
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError as e:
+        raise SystemExit(
+            "In-memory Mongo requires mongomock-motor: "
+            "pip install -r benchmarks/requirements.txt"
+        ) from e
+    return AsyncMongoMockClient()
+
+
+class _FakePart:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.parts = [_FakePart(text)]
+        self.text = text
+
+
+class FakeGeminiError(RuntimeError):
+    pass
+
+
+class FakeGeminiModel:
+    """
+    Drop-in replacement for genai.GenerativeModel.
+
+    generate_content() sleeps for latency +/- jitter and fails with the
+    configured probability, so triage behaves like a real (slow, flaky) model.
+    """
+
+    SKILLS = ["python", "mongodb", "react", "networking", "billing", "devops", "security"]
+    PRIORITIES = ["low", "medium", "high", "urgent"]
+    TICKET_TYPES = ["bug", "feature", "support", "technical", "other"]
+
+    def __init__(self, latency_ms: float = 200.0, jitter_ms: float = 50.0,
+                 failure_rate: float = 0.0, seed: int = 0, model_name: str = "fake-gemini"):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    def _delay(self) -> float:
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def _payload(self) -> str:
+        return json.dumps({
+            "required_skills": self._rng.sample(self.SKILLS, 2),
+            "priority": self._rng.choice(self.PRIORITIES),
+            "ticket_type": self._rng.choice(self.TICKET_TYPES),
+            "helpful_notes": "Synthetic triage from the benchmark model.",
+        })
+
+    def _respond(self):
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeGeminiError("Injected Gemini failure")
+        return _FakeResponse(f"```json\n{self._payload()}\n```")
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self._delay())
+        return self._respond()
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return self._respond()
+
+
+class SmtpSink:
+    """
+    Minimal SMTP server that accepts AUTH and every message, and discards it.
+    Good enough for smtplib's EHLO / AUTH PLAIN / MAIL / RCPT / DATA / QUIT.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        try:
+            await reply("220 bench-sink ESMTP")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command = raw.decode(errors="replace").strip().upper()
+
+                if command.startswith(("EHLO", "HELO")):
+                    writer.write(b"250-bench-sink\r\n250-AUTH PLAIN LOGIN\r\n")
+                    await reply("250 OK")
+                elif command.startswith("AUTH"):
+                    await reply("235 Authentication successful")
+                elif command.startswith("DATA"):
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while True:
+                        line = await reader.readline()
+                        if not line or line in (b".\r\n", b".\n"):
+                            break
+                    self.messages += 1
+                    await reply("250 OK: queued")
+                elif command.startswith("QUIT"):
+                    await reply("221 Bye")
+                    break
+                else:
+                    # MAIL, RCPT, RSET, NOOP ...
+                    await reply("250 OK")
+        finally:
+            writer.close()
@@ -0,0 +1,476 @@
+# benchmarks/run_benchmark.py
+
+"""
+Load/benchmark harness for the AI Ticket System API.
+
+Boots the FastAPI app in-process against an in-memory (or local) MongoDB,
+a fake Gemini model and a local SMTP sink, drives the main API flows at a
+configurable concurrency and writes throughput and latency percentiles
+to a JSON file that can be compared across commits.
+
+    python -m benchmarks.run_benchmark --concurrency 32 --iterations 300
+    python -m benchmarks.run_benchmark --baseline old.json --output new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.fakes import FakeGeminiModel, SmtpSink, create_memory_mongo_client
+
+DEFAULT_SCENARIOS = [
+    "signup",
+    "login",
+    "create_ticket",
+    "create_ticket_retry",
+    "bulk_create",
+    "list_tickets",
+    "list_tickets_conditional",
+    "ticket_detail",
+    "update_status",
+    "bulk_status",
+    "stats",
+    "list_users",
+    "rerun_ai",
+]
+
+BENCH_PASSWORD = "bench-password"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AI Ticket System API")
+    parser.add_argument("--mongo", default="memory",
+                        help="'memory' for an in-memory stand-in, or a MongoDB URL")
+    parser.add_argument("--db-name", default="ai_ticket_bench",
+                        help="Database used (and dropped) when --mongo is a URL")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Requests per scenario")
+    parser.add_argument("--rerun-iterations", type=int, default=5,
+                        help="Requests for the (heavy) rerun_ai scenario")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help="Comma separated list of scenarios to run")
+    parser.add_argument("--bulk-size", type=int, default=50,
+                        help="Tickets per request in the bulk_create scenario")
+    parser.add_argument("--users", type=int, default=20, help="Seeded end users")
+    parser.add_argument("--moderators", type=int, default=5, help="Seeded moderators")
+    parser.add_argument("--seed-tickets", type=int, default=200,
+                        help="Tickets created before the read scenarios")
+    parser.add_argument("--gemini-latency-ms", type=float, default=200.0)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.1)
+    parser.add_argument("--gemini-models", type=int, default=2,
+                        help="Number of fake models in the hedging tier list")
+    parser.add_argument("--gemini-secondary-latency-ms", type=float, default=300.0,
+                        help="Latency of the non-primary fake models")
+    parser.add_argument("--loop-watchdog-ms", type=float, default=0,
+                        help="Report event-loop stalls longer than this (0 = off)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None,
+                        help="Previous result file to compare against")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list, errors: int, wall_seconds: float) -> dict:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_rps": round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if count else 0.0,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+class BenchContext:
+    """Shared state (client, tokens, ids) used by the scenarios."""
+
+    def __init__(self, client, db, args):
+        self.client = client
+        self.db = db
+        self.args = args
+        self.user_tokens: list[str] = []
+        self.user_emails: list[str] = []
+        self.moderator_tokens: list[str] = []
+        self.admin_token: str | None = None
+        self.ticket_ids: list[str] = []
+        self.etags: dict[str, str] = {}
+
+    @staticmethod
+    def auth(token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+
+# ---------------------------------------------------------------------------
+# Scenarios: each issues exactly one HTTP request and returns the response
+# ---------------------------------------------------------------------------
+
+async def scenario_signup(ctx: BenchContext, i: int):
+    return await ctx.client.post("/api/auth/signup", json={
+        "email": f"signup{i}@bench.example.com",
+        "username": f"signup{i}",
+        "password": BENCH_PASSWORD,
+        "full_name": f"Signup {i}",
+    })
+
+
+async def scenario_login(ctx: BenchContext, i: int):
+    email = ctx.user_emails[i % len(ctx.user_emails)]
+    return await ctx.client.post("/api/auth/login", json={
+        "email": email,
+        "password": BENCH_PASSWORD,
+    })
+
+
+async def scenario_create_ticket(ctx: BenchContext, i: int):
+    token = ctx.user_tokens[i % len(ctx.user_tokens)]
+    response = await ctx.client.post("/api/tickets/", headers=ctx.auth(token), json={
+        "title": f"Benchmark ticket {i}",
+        # Every tenth ticket looks urgent to the AI scheduler's pre-score
+        "description": ("Entire production down, checkout returns 500." if i % 10 == 0
+                        else "The service returns 500 when saving the profile form."),
+    })
+    if response.status_code == 200:
+        ctx.ticket_ids.append(response.json()["id"])
+    return response
+
+
+async def scenario_create_ticket_retry(ctx: BenchContext, i: int):
+    # Every request is sent twice with the same Idempotency-Key, as a client retrying after a timeout
+    token = ctx.user_tokens[i // 2 % len(ctx.user_tokens)]
+    headers = {**ctx.auth(token), "Idempotency-Key": f"bench-retry-{i // 2}"}
+    return await ctx.client.post("/api/tickets/", headers=headers, json={
+        "title": f"Benchmark retried ticket {i // 2}",
+        "description": "The service returns 500 when saving the profile form.",
+    })
+
+
+async def scenario_bulk_create(ctx: BenchContext, i: int):
+    token = ctx.user_tokens[i % len(ctx.user_tokens)]
+    return await ctx.client.post("/api/tickets/bulk", headers=ctx.auth(token), json={
+        "tickets": [
+            {
+                "title": f"Imported alert {i}-{n}",
+                "description": "Monitoring: disk usage above 90% on db-01.",
+            }
+            for n in range(ctx.args.bulk_size)
+        ]
+    })
+
+
+async def scenario_list_tickets(ctx: BenchContext, i: int):
+    tokens = ctx.user_tokens + ctx.moderator_tokens + [ctx.admin_token]
+    return await ctx.client.get("/api/tickets/", headers=ctx.auth(tokens[i % len(tokens)]))
+
+
+async def scenario_list_tickets_conditional(ctx: BenchContext, i: int):
+    """Polling client that revalidates with the last ETag it saw."""
+    tokens = ctx.user_tokens + ctx.moderator_tokens + [ctx.admin_token]
+    token = tokens[i % len(tokens)]
+    headers = ctx.auth(token)
+    if token in ctx.etags:
+        headers["If-None-Match"] = ctx.etags[token]
+    response = await ctx.client.get("/api/tickets/", headers=headers)
+    if "etag" in response.headers:
+        ctx.etags[token] = response.headers["etag"]
+    return response
+
+
+async def scenario_ticket_detail(ctx: BenchContext, i: int):
+    ticket_id = ctx.ticket_ids[i % len(ctx.ticket_ids)]
+    return await ctx.client.get(f"/api/tickets/{ticket_id}", headers=ctx.auth(ctx.admin_token))
+
+
+async def scenario_update_status(ctx: BenchContext, i: int):
+    ticket_id = ctx.ticket_ids[i % len(ctx.ticket_ids)]
+    new_status = ["in_progress", "resolved", "open"][i % 3]
+    return await ctx.client.patch(
+        f"/api/tickets/{ticket_id}/status",
+        headers=ctx.auth(ctx.admin_token),
+        json={"status": new_status},
+    )
+
+
+async def scenario_bulk_status(ctx: BenchContext, i: int):
+    size = ctx.args.bulk_size
+    start = (i * size) % len(ctx.ticket_ids)
+    ticket_ids = (ctx.ticket_ids[start:] + ctx.ticket_ids[:start])[:size]
+    return await ctx.client.patch(
+        "/api/tickets/bulk/status",
+        headers=ctx.auth(ctx.admin_token),
+        json={"ticket_ids": ticket_ids, "status": ["in_progress", "resolved"][i % 2]},
+    )
+
+
+async def scenario_stats(ctx: BenchContext, i: int):
+    return await ctx.client.get("/api/tickets/stats/dashboard", headers=ctx.auth(ctx.admin_token))
+
+
+async def scenario_list_users(ctx: BenchContext, i: int):
+    """Admin directory: moderators only, first page."""
+    return await ctx.client.get("/api/admin/users", headers=ctx.auth(ctx.admin_token),
+                                params={"role": "moderator", "limit": 50})
+
+
+async def scenario_rerun_ai(ctx: BenchContext, i: int):
+    """Start the background re-analysis (or join the running one) and wait until it is done."""
+    response = await ctx.client.post("/api/admin/rerun-ai", headers=ctx.auth(ctx.admin_token))
+    while response.status_code < 400 and response.json()["running"]:
+        await asyncio.sleep(0.2)
+        response = await ctx.client.get("/api/admin/rerun-ai", headers=ctx.auth(ctx.admin_token))
+    return response
+
+
+SCENARIOS = {
+    "signup": scenario_signup,
+    "login": scenario_login,
+    "create_ticket": scenario_create_ticket,
+    "create_ticket_retry": scenario_create_ticket_retry,
+    "bulk_create": scenario_bulk_create,
+    "list_tickets": scenario_list_tickets,
+    "list_tickets_conditional": scenario_list_tickets_conditional,
+    "ticket_detail": scenario_ticket_detail,
+    "update_status": scenario_update_status,
+    "bulk_status": scenario_bulk_status,
+    "stats": scenario_stats,
+    "list_users": scenario_list_users,
+    "rerun_ai": scenario_rerun_ai,
+}
+
+
+async def run_scenario(ctx: BenchContext, name: str, iterations: int, concurrency: int) -> dict:
+    scenario = SCENARIOS[name]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await scenario(ctx, i)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    return summarize(latencies, errors, time.perf_counter() - wall_start)
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+async def seed_accounts(ctx: BenchContext, n_users: int, n_moderators: int):
+    """Insert admin/moderators/users directly and log them in via the API."""
+    from app.utils.security import get_password_hash
+
+    hashed = get_password_hash(BENCH_PASSWORD)
+    now = datetime.utcnow()
+
+    def user_doc(email, username, role, skills):
+        return {
+            "email": email,
+            "username": username,
+            "hashed_password": hashed,
+            "full_name": username,
+            "role": role,
+            "skills": skills,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": None,
+        }
+
+    docs = [user_doc("admin@bench.example.com", "bench-admin", "admin", [])]
+    skills = FakeGeminiModel.SKILLS
+    for m in range(n_moderators):
+        docs.append(user_doc(f"mod{m}@bench.example.com", f"bench-mod{m}", "moderator",
+                             [skills[m % len(skills)], skills[(m + 2) % len(skills)]]))
+    for u in range(n_users):
+        docs.append(user_doc(f"user{u}@bench.example.com", f"bench-user{u}", "user", []))
+    await ctx.db.users.insert_many(docs)
+
+    async def login(email):
+        response = await ctx.client.post("/api/auth/login",
+                                         json={"email": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    ctx.admin_token = await login("admin@bench.example.com")
+    ctx.moderator_tokens = [await login(f"mod{m}@bench.example.com") for m in range(n_moderators)]
+    ctx.user_emails = [f"user{u}@bench.example.com" for u in range(n_users)]
+    ctx.user_tokens = [await login(email) for email in ctx.user_emails]
+
+
+async def connect_database(args):
+    """Point the app's MongoDB holder at the benchmark database."""
+    from app.models.database import mongodb, create_indexes
+
+    if args.mongo == "memory":
+        client = create_memory_mongo_client()
+        db = client[args.db_name]
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo)
+        await client.drop_database(args.db_name)
+        db = client[args.db_name]
+
+    mongodb.client = client
+    mongodb.database = db
+    await create_indexes()
+    return client, db
+
+
+def compare(baseline: dict, current: dict) -> str:
+    lines = [f"{'scenario':<16}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}"]
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            before, after = old.get(metric, 0.0), result.get(metric, 0.0)
+            change = ((after - before) / before * 100.0) if before else 0.0
+            lines.append(f"{name:<16}{metric:<16}{before:>12.2f}{after:>12.2f}{change:>9.1f}%")
+    return "\n".join(lines)
+
+
+async def main(args) -> dict:
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    sink = SmtpSink()
+    await sink.start()
+
+    # Settings are read at import time, so configure the environment first.
+    os.environ.update({
+        "GEMINI_API_KEY": "",
+        "SMTP_HOST": sink.host,
+        "SMTP_PORT": str(sink.port),
+        "SMTP_USER": "bench",
+        "SMTP_PASSWORD": "bench",
+        "SMTP_USE_TLS": "false",
+    })
+    if args.loop_watchdog_ms:
+        os.environ.update({
+            "LOOP_WATCHDOG_ENABLED": "true",
+            "LOOP_WATCHDOG_THRESHOLD_MS": str(args.loop_watchdog_ms),
+        })
+
+    import httpx
+    from app.main import app
+    from app.services.ai_service import ai_service
+    from app.utils.background_tasks import background_tasks
+    from app.utils.admission import admission_controller
+    from app.utils.single_flight import get_single_flight_stats
+    from app.utils.loop_watchdog import loop_watchdog
+
+    fake_models = {
+        f"fake-gemini-{n}": FakeGeminiModel(
+            latency_ms=args.gemini_latency_ms if n == 0 else args.gemini_secondary_latency_ms,
+            jitter_ms=args.gemini_jitter_ms,
+            failure_rate=args.gemini_failure_rate,
+            seed=args.seed + n,
+            model_name=f"fake-gemini-{n}",
+        )
+        for n in range(max(1, args.gemini_models))
+    }
+    ai_service.set_models(fake_models)
+
+    client, db = await connect_database(args)
+    await loop_watchdog.start()
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        ctx = BenchContext(http, db, args)
+        await seed_accounts(ctx, args.users, args.moderators)
+
+        # Read/update scenarios need tickets to exist
+        if args.seed_tickets:
+            await run_scenario(ctx, "create_ticket", args.seed_tickets, args.concurrency)
+
+        for name in scenarios:
+            iterations = args.rerun_iterations if name == "rerun_ai" else args.iterations
+            print(f"▶ {name}: {iterations} requests @ concurrency {args.concurrency}")
+            results[name] = await run_scenario(ctx, name, iterations, args.concurrency)
+            r = results[name]
+            print(f"  {r['throughput_rps']} req/s  p50={r['p50_ms']}ms  "
+                  f"p95={r['p95_ms']}ms  p99={r['p99_ms']}ms  errors={r['errors']}")
+
+        await background_tasks.wait_for_all()
+
+    await loop_watchdog.stop()
+
+    await sink.stop()
+    if args.mongo != "memory":
+        await client.drop_database(args.db_name)
+
+    return {
+        "meta": {
+            "git_commit": git_revision(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "gemini_calls": sum(m.calls for m in fake_models.values()),
+            "gemini_failures": sum(m.failures for m in fake_models.values()),
+            "ai_model_stats": ai_service.get_model_stats(),
+            "ai_scheduler_stats": ai_service.get_scheduler_stats(),
+            "ai_prompt_stats": ai_service.get_prompt_stats(),
+            "admission_stats": admission_controller.get_stats(),
+            "single_flight_stats": get_single_flight_stats(),
+            "loop_stalls": loop_watchdog.get_stats(),
+            "emails_sent": sink.messages,
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(json.load(f), report))
+    sys.exit(0)
@@ -0,0 +1,51 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models.database import mongodb
+from app.services.ai_service import ai_service, FALLBACK_MODEL
+from app.services.email_service import email_service
+
+
+@pytest.fixture
+def db():
+    """In-memory MongoDB stand-in, installed as the app database."""
+    previous = mongodb.database
+    mongodb.database = AsyncMongoMockClient().ticket_tests
+    yield mongodb.database
+    mongodb.database = previous
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    """
+    Replaces the AI call with scripted results: push model names (or exceptions)
+    onto `fake_ai.script`; once it runs out every call answers with "fake-model".
+    """
+    class FakeAI:
+        def __init__(self):
+            self.script = []
+            self.calls = 0
+
+        async def analyze_ticket(self, title, description, reporter_role=None):
+            self.calls += 1
+            outcome = self.script.pop(0) if self.script else "fake-model"
+            if isinstance(outcome, Exception):
+                raise outcome
+            return {
+                "required_skills": ["general"],
+                "priority": "high",
+                "ticket_type": "bug",
+                "helpful_notes": "" if outcome == FALLBACK_MODEL else "Check the logs.",
+                "model": outcome,
+                "ai_version": ai_service.analysis_version(outcome),
+            }
+
+    fake = FakeAI()
+    monkeypatch.setattr(ai_service, "analyze_ticket", fake.analyze_ticket)
+    monkeypatch.setattr(ai_service, "_providers", [object()])
+
+    async def no_email(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(email_service, "send_ticket_assignment_email", no_email)
+    return fake
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.models.ticket import TicketStatus
+from app.services.ticket_service import TicketService, INVALID_TRANSITION
+
+
+def test_every_ticket_write_moves_the_list_version(db, fake_ai):
+    service = TicketService(db)
+
+    async def scenario():
+        versions = [await service.get_tickets_version()]
+        ticket = await service.create_ticket("Checkout fails", "Payment failed.", str(ObjectId()))
+        versions.append(await service.get_tickets_version())
+        await service.update_ticket_status(str(ticket.id), TicketStatus.IN_PROGRESS)
+        versions.append(await service.get_tickets_version())
+        return versions
+
+    versions = asyncio.run(scenario())
+    # create (+ triage) and the status change each bump the counter
+    assert versions[0] < versions[1] < versions[2]
+
+
+def test_bulk_status_survives_a_write_before_the_update(db, fake_ai):
+    class RacingTickets:
+        """db.tickets whose update_many lets another write land first."""
+        def __getattr__(self, name):
+            return getattr(db.tickets, name)
+
+        async def update_many(self, query, update, **kwargs):
+            await db.tickets.update_many({}, {"$set": {"priority": "high"}, "$inc": {"version": 1}})
+            return await db.tickets.update_many(query, update, **kwargs)
+
+    class RacingDB:
+        tickets = RacingTickets()
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+    async def scenario():
+        ticket = await TicketService(db).create_ticket("Checkout fails", "Payment failed.", str(ObjectId()))
+        outcomes = await TicketService(RacingDB()).update_ticket_status_bulk([str(ticket.id)], TicketStatus.IN_PROGRESS)
+        return outcomes, await db.tickets.find_one({"_id": ticket.id})
+
+    outcomes, stored = asyncio.run(scenario())
+    assert list(outcomes.values()) == [None]
+    assert stored["status"] == TicketStatus.IN_PROGRESS
+
+
+def test_claim_next_matches_skills_and_skips_untriaged_tickets(db):
+    def ticket(skills, rank, ai_version="v1"):
+        return {
+            "_id": ObjectId(), "title": "t", "description": "d", "status": "open", "priority": "medium",
+            "priority_rank": rank, "required_skills": skills, "created_by": str(ObjectId()),
+            "assigned_to": None, "created_at": datetime.utcnow(), "version": 1, "ai_version": ai_version,
+        }
+
+    untriaged = ticket([], 9, ai_version=None)
+    database = ticket(["Database"], 5)
+    payments = ticket(["Payments"], 3)
+    service = TicketService(db)
+
+    async def scenario():
+        await db.tickets.insert_many([untriaged, database, payments])
+        moderator = await service.claim_next_ticket(str(ObjectId()), ["payments-API"])
+        admin = await service.claim_next_ticket(str(ObjectId()))
+        nothing_left = await service.claim_next_ticket(str(ObjectId()))
+        return moderator, admin, nothing_left
+
+    moderator, admin, nothing_left = asyncio.run(scenario())
+    assert moderator.id == payments["_id"]
+    assert admin.id == database["_id"]
+    assert nothing_left is None
+
+
+def test_closed_ticket_cannot_be_closed_again(db, fake_ai):
+    service = TicketService(db)
+
+    async def scenario():
+        ticket = await service.create_ticket("Checkout fails", "Payment failed.", str(ObjectId()))
+        closed, _ = await service.update_ticket_status(str(ticket.id), TicketStatus.CLOSED)
+        again = await service.update_ticket_status(str(ticket.id), TicketStatus.CLOSED)
+        return closed, again, await db.tickets.find_one({"_id": ticket.id})
+
+    closed, again, stored = asyncio.run(scenario())
+    assert again == (None, INVALID_TRANSITION)
+    assert stored["version"] == closed["version"]
+    assert stored["updated_at"] == closed["updated_at"]
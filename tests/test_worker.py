@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app import worker
+from app.config import settings
+from app.services.ai_service import ai_service, FALLBACK_MODEL
+from app.services.ticket_service import TicketService
+
+
+@pytest.fixture
+def eager_worker(db, monkeypatch):
+    """Run triage tasks inline (task_always_eager) on a loop of their own, like a worker process."""
+    monkeypatch.setitem(worker.celery_app.conf, "task_always_eager", True)
+    loop = asyncio.new_event_loop()
+    monkeypatch.setattr(worker, "_loop", loop)
+    yield loop
+    loop.close()
+
+
+def insert_ticket(loop, db) -> str:
+    ticket_id = ObjectId()
+    loop.run_until_complete(db.tickets.insert_one({
+        "_id": ticket_id,
+        "title": "Checkout fails",
+        "description": "Payment failed with a 500 error.",
+        "status": "open",
+        "priority": "medium",
+        "created_by": str(ObjectId()),
+        "assigned_to": None,
+        "created_at": datetime.utcnow(),
+        "updated_at": None,
+        "version": 1,
+        "ai_version": None,
+        "first_response_at": None,
+        "triage_status": "pending",
+    }))
+    return str(ticket_id)
+
+
+def get_ticket(loop, db, ticket_id: str) -> dict:
+    return loop.run_until_complete(db.tickets.find_one({"_id": ObjectId(ticket_id)}))
+
+
+def test_enqueue_triages_the_ticket(eager_worker, db, fake_ai):
+    ticket_id = insert_ticket(eager_worker, db)
+
+    asyncio.run(worker.enqueue_triage_async([ticket_id]))
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert ticket["triage_status"] == "done"
+    assert ticket["triage_lease_until"] is None
+    assert ticket["ai_version"] == ai_service.analysis_version("fake-model")
+    assert ticket["priority"] == "high"
+    assert fake_ai.calls == 1
+
+
+def test_enqueue_failure_triages_in_process(eager_worker, db, fake_ai, monkeypatch):
+    ticket_id = insert_ticket(eager_worker, db)
+
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(worker, "enqueue_triage", broker_down)
+    asyncio.run(worker.enqueue_triage_async([ticket_id]))
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert ticket["triage_status"] == "done"
+    assert ticket["ai_version"] == ai_service.analysis_version("fake-model")
+
+
+def test_fallback_analysis_is_retried(eager_worker, db, fake_ai):
+    ticket_id = insert_ticket(eager_worker, db)
+    fake_ai.script = [FALLBACK_MODEL, FALLBACK_MODEL]
+
+    assert worker.triage_ticket.delay(ticket_id).get() == "done"
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert fake_ai.calls == 3
+    assert ticket["ai_version"] == ai_service.analysis_version("fake-model")
+    assert ticket["triage_status"] == "done"
+
+
+def test_last_attempt_keeps_the_fallback(eager_worker, db, fake_ai, monkeypatch):
+    monkeypatch.setattr(worker.triage_ticket, "max_retries", 2)
+    ticket_id = insert_ticket(eager_worker, db)
+    fake_ai.script = [FALLBACK_MODEL] * 10
+
+    assert worker.triage_ticket.delay(ticket_id).get() == "done"
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert fake_ai.calls == 3
+    assert ticket["ai_version"] == ai_service.analysis_version(FALLBACK_MODEL)
+    assert ticket["triage_status"] == "done"
+
+
+def test_non_retryable_error_fails_at_once(eager_worker, db, fake_ai):
+    ticket_id = insert_ticket(eager_worker, db)
+    fake_ai.script = [ValueError("unexpected response shape")]
+
+    with pytest.raises(ValueError):
+        worker.triage_ticket.delay(ticket_id).get()
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert fake_ai.calls == 1
+    # The lease is released so a later delivery can claim the ticket
+    assert ticket["triage_status"] == "pending"
+    assert ticket["triage_lease_until"] is None
+
+
+def test_invalid_or_missing_ticket_is_not_retried(eager_worker, db, fake_ai):
+    assert worker.triage_ticket.delay("not-an-id").get() == "invalid"
+    assert worker.triage_ticket.delay(str(ObjectId())).get() == "skipped"
+    assert fake_ai.calls == 0
+
+
+def test_redelivery_is_idempotent(eager_worker, db, fake_ai):
+    ticket_id = insert_ticket(eager_worker, db)
+
+    assert worker.triage_ticket.delay(ticket_id).get() == "done"
+    assert worker.triage_ticket.delay(ticket_id).get() == "skipped"
+
+    ticket = get_ticket(eager_worker, db, ticket_id)
+    assert fake_ai.calls == 1
+    assert ticket["version"] == 2
+
+
+def test_create_ticket_survives_a_broker_outage(eager_worker, db, fake_ai, monkeypatch):
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(settings, "triage_backend", "celery")
+    monkeypatch.setattr(worker, "enqueue_triage", broker_down)
+    ticket = asyncio.run(TicketService(db).create_ticket("Checkout fails", "Payment failed.", str(ObjectId())))
+
+    stored = get_ticket(eager_worker, db, str(ticket.id))
+    assert stored["triage_status"] == "done"
+    assert stored["ai_version"] == ai_service.analysis_version("fake-model")